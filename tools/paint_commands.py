@@ -3,14 +3,27 @@ import time
 import win32api
 import win32con
 import pyautogui
+import numpy as np
+import mss
+from PIL import Image
 from pywinauto.keyboard import send_keys
 from pywinauto import Application, timings
 import win32gui
+import win32event
+import win32process
 import subprocess
+import ctypes
+from ctypes import wintypes
 import math
 import logging
+import logging.handlers
+import queue
+import atexit
+import threading
 from datetime import datetime
 import sys
+from collections import namedtuple
+from dataclasses import dataclass
 from pathlib import Path
 
 # Configure logging
@@ -19,30 +32,206 @@ if not os.path.exists(log_dir):
     os.makedirs(log_dir)
 
 log_file = os.path.join(log_dir, f"paint_operations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
+
+# Log records are queued and written by a background listener so file
+# flushes never block mouse/keyboard automation
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+log_handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Attach the queue handler directly: basicConfig would give it a default formatter,
+# which QueueHandler.prepare() bakes into the message before the listener formats it again
+root_logger = logging.getLogger()
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+root_logger.setLevel(logging.INFO)
 
 # Configure PyAutoGUI
 pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.5  # Add delay between actions
+pyautogui.PAUSE = 0  # Drawing code waits explicitly where Paint needs it
+
+# Canvas bounds in screen coordinates, returned by get_paint_canvas_info()
+CanvasInfo = namedtuple('CanvasInfo', 'left top width height right bottom')
+
+# Windows 11 Paint toolbar layout, relative to the window origin
+SHAPES_BUTTON_REL_X = 0.35  # Shapes button, 35% from left edge
+BRUSH_BUTTON_REL_X = 0.15   # Brushes button, 15% from left edge
+TOOLBAR_BUTTON_Y = 55       # Fixed Y position of toolbar buttons from top
+
+# Shape positions (column, row) in the Shapes dropdown grid, Windows 11 Paint UI
+SHAPE_GRID = {
+    'line': (0, 0),         # First item, first row
+    'curve': (1, 0),        # Second item, first row
+    'rectangle': (0, 1),    # First item, second row
+    'square': (1, 1),       # Second item, second row
+    'oval': (2, 1),         # Third item, second row
+    'circle': (3, 1),       # Fourth item, second row
+    'triangle': (0, 2),     # First item, third row
+}
+# Menu item captions tried for each shape when classic Paint exposes a menu bar
+SHAPE_MENU_NAMES = {
+    'circle': ('ellipse', 'circle'),
+    'oval': ('ellipse', 'oval'),
+}
+SHAPE_ITEM_WIDTH = 40       # Each grid item is approximately 40px wide
+SHAPE_ITEM_HEIGHT = 35      # and 35px tall
+SHAPE_DROPDOWN_OFFSET = 40  # Initial dropdown offset below the Shapes button
+
+# Paint palette colors, entered through the Edit Colors dialog
+COLOR_HEX = {
+    'black': '#000000',
+    'white': '#FFFFFF',
+    'red': '#ED1C24',
+    'blue': '#3F48CC',
+    'green': '#22B14C'
+}
+
+# Canvas margins around the Paint window
+CANVAS_TITLE_HEIGHT = 32       # Top window title bar
+CANVAS_RIBBON_HEIGHT = 93      # Height of ribbon and toolbars
+CANVAS_STATUS_HEIGHT = 26      # Bottom status bar
+CANVAS_LEFT_MARGIN = 10        # Left margin (minimal in Win11 Paint)
+CANVAS_RIGHT_MARGIN_REL = 0.25 # Right margin (approx 25% of window width)
+
+# Summed per-channel RGB difference above which a pixel counts as changed,
+# so anti-aliasing noise is not mistaken for a drawn shape
+PIXEL_DIFF_THRESHOLD = 30
+
+@dataclass
+class _ToolLayout:
+    """Screen positions of Paint UI elements for one window placement."""
+    hwnd: int
+    window_rect: tuple
+    shapes_btn_xy: tuple
+    shape_xy: dict
+    brush_btn_xy: tuple
+    neutral_xy: tuple
+    canvas_rect: tuple  # (left, top, right, bottom)
+
+_layout = None
+
+# Last tool and color selected through this module, used to skip redundant
+# re-selection. Reset whenever Paint is launched or closed.
+_paint_state = {'active_tool': None, 'color': None}
+
+# WM_COMMAND ids of classic Paint menu items, keyed by window handle
+_menu_commands = {}
+
+# Win32 SendInput structures for batched, animation-free input
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_ABSOLUTE = 0x8000
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", wintypes.LONG),
+                ("dy", wintypes.LONG),
+                ("mouseData", wintypes.DWORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ctypes.c_size_t)]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", wintypes.WORD),
+                ("wScan", wintypes.WORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ctypes.c_size_t)]
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [("uMsg", wintypes.DWORD),
+                ("wParamL", wintypes.WORD),
+                ("wParamH", wintypes.WORD)]
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT),
+                ("ki", KEYBDINPUT),
+                ("hi", HARDWAREINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD),
+                ("union", _INPUTUNION)]
+
+_user32 = ctypes.windll.user32
+
+# GDI structures for capturing a screen region into a DIB section
+SRCCOPY = 0x00CC0020
+DIB_RGB_COLORS = 0
+BI_RGB = 0
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [("biSize", wintypes.DWORD),
+                ("biWidth", wintypes.LONG),
+                ("biHeight", wintypes.LONG),
+                ("biPlanes", wintypes.WORD),
+                ("biBitCount", wintypes.WORD),
+                ("biCompression", wintypes.DWORD),
+                ("biSizeImage", wintypes.DWORD),
+                ("biXPelsPerMeter", wintypes.LONG),
+                ("biYPelsPerMeter", wintypes.LONG),
+                ("biClrUsed", wintypes.DWORD),
+                ("biClrImportant", wintypes.DWORD)]
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [("bmiHeader", BITMAPINFOHEADER),
+                ("bmiColors", wintypes.DWORD * 3)]
+
+_gdi32 = ctypes.windll.gdi32
+_user32.GetDC.restype = wintypes.HDC
+_user32.GetDC.argtypes = [wintypes.HWND]
+_user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+_gdi32.CreateCompatibleDC.restype = wintypes.HDC
+_gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+_gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+_gdi32.CreateDIBSection.argtypes = [wintypes.HDC, ctypes.POINTER(BITMAPINFO), wintypes.UINT,
+                                    ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD]
+_gdi32.SelectObject.restype = wintypes.HGDIOBJ
+_gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+_gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                          wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+_gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+_gdi32.DeleteDC.argtypes = [wintypes.HDC]
+
+# Cached capture DIB: (screen_dc, mem_dc, hbitmap, old_bitmap, bits, width, height)
+_dib = None
+_dib_lock = threading.Lock()  # Guards the shared DIB if captures run on several threads
+
+# Primary monitor geometry for drawing verification captures (taken with GDI),
+# so array indices match the screen coordinates used by pyautogui.
+_sct = mss.mss()
+_monitor = _sct.monitors[1]
+
+# Memoized result of _enum_paint_windows(): (timestamp, [(hwnd, title, class)])
+_enum_cache = (0.0, [])
+ENUM_CACHE_TTL = 0.5  # seconds
+
+# Last GetWindowRect result: (hwnd, rect, perf_counter timestamp)
+_cached_rect = (None, None, 0.0)
+WINDOW_RECT_TTL = 0.1  # seconds
+
+# Last get_paint_canvas_info() result: ((hwnd, window_rect), CanvasInfo)
+_canvas_cache = (None, None)
 
 def log_window_info():
     """Log information about the Paint window and screen."""
     try:
         paint_window = win32gui.FindWindow(None, "Untitled - Paint")
         if paint_window:
-            window_rect = win32gui.GetWindowRect(paint_window)
+            window_rect = _get_window_rect(paint_window)
             screen_width, screen_height = pyautogui.size()
             
-            logging.info(f"Screen resolution: {screen_width}x{screen_height}")
-            logging.info(f"Paint window rectangle: {window_rect}")
-            logging.info(f"Paint window dimensions: {window_rect[2]-window_rect[0]}x{window_rect[3]-window_rect[1]}")
+            logging.info("Screen resolution: %sx%s", screen_width, screen_height)
+            logging.info("Paint window rectangle: %s", window_rect)
+            logging.info("Paint window dimensions: %sx%s", window_rect[2]-window_rect[0], window_rect[3]-window_rect[1])
             
             # Get window state
             placement = win32gui.GetWindowPlacement(paint_window)
@@ -51,17 +240,17 @@ def log_window_info():
                 state = "Maximized"
             elif placement[1] == win32con.SW_SHOWMINIMIZED:
                 state = "Minimized"
-            logging.info(f"Paint window state: {state}")
+            logging.info("Paint window state: %s", state)
             
             return True
     except Exception as e:
-        logging.error(f"Error getting window info: {str(e)}")
+        logging.error("Error getting window info: %s", e)
         return False
 
 def verify_mouse_position(expected_x, expected_y):
     """Verify if mouse is at the expected position."""
     actual_x, actual_y = pyautogui.position()
-    logging.info(f"Mouse position - Expected: ({expected_x}, {expected_y}), Actual: ({actual_x}, {actual_y})")
+    logging.info("Mouse position - Expected: (%s, %s), Actual: (%s, %s)", expected_x, expected_y, actual_x, actual_y)
     return abs(actual_x - expected_x) < 5 and abs(actual_y - expected_y) < 5
 
 def highlight_click_location(x, y, duration=0.5):
@@ -82,12 +271,12 @@ def safe_click(x, y, description="", highlight=True):
         if highlight:
             highlight_click_location(x, y)
         current_x, current_y = pyautogui.position()
-        logging.info(f"Clicking {description} at ({x}, {y}). Current mouse at ({current_x}, {current_y})")
+        logging.info("Clicking %s at (%s, %s). Current mouse at (%s, %s)", description, x, y, current_x, current_y)
         pyautogui.click(x, y)
         time.sleep(0.5)  # Wait after click
         return True
     except Exception as e:
-        logging.error(f"Failed to click at ({x}, {y}): {str(e)}")
+        logging.error("Failed to click at (%s, %s): %s", x, y, e)
         return False
 
 def find_paint_window():
@@ -105,30 +294,395 @@ def find_paint_window():
             if hwnd and win32gui.IsWindowVisible(hwnd):
                 # Verify this is classic Paint by checking window class
                 window_class = win32gui.GetClassName(hwnd)
-                logging.info(f"Found Paint window with class: {window_class}")
+                logging.info("Found Paint window with class: %s", window_class)
                 if window_class == "MSPaintApp":
                     logging.info("Confirmed classic MSPaint application")
                 return hwnd
                 
         # Last resort: search by partial title and class
-        def enum_callback(hwnd, results):
-            if win32gui.IsWindowVisible(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                window_class = win32gui.GetClassName(hwnd)
-                if "Paint" in title and window_class == "MSPaintApp":
-                    logging.info(f"Found Paint window via enumeration: {title}, class: {window_class}")
-                    results.append(hwnd)
-                    
-        paint_windows = []
-        win32gui.EnumWindows(enum_callback, paint_windows)
-        
-        if paint_windows:
-            return paint_windows[0]
+        for hwnd, title, window_class in _enum_paint_windows():
+            if window_class == "MSPaintApp":
+                logging.info("Found Paint window via enumeration: %s, class: %s", title, window_class)
+                return hwnd
             
         return None
     except Exception as e:
-        logging.error(f"Error finding Paint window: {str(e)}")
+        logging.error("Error finding Paint window: %s", e)
+        return None
+
+def _enum_paint_windows():
+    """
+    List visible top-level windows with "Paint" in the title as
+    (hwnd, title, class) tuples. The EnumWindows pass is memoized for
+    ENUM_CACHE_TTL seconds so retry loops share a single enumeration.
+    """
+    global _enum_cache
+    timestamp, paint_windows = _enum_cache
+    now = time.monotonic()
+    if now - timestamp < ENUM_CACHE_TTL:
+        # Drop windows that were closed since the enumeration
+        paint_windows = [window for window in paint_windows if win32gui.IsWindow(window[0])]
+        if paint_windows:
+            return paint_windows
+        
+    def enum_callback(hwnd, results):
+        if win32gui.IsWindowVisible(hwnd):
+            title = win32gui.GetWindowText(hwnd)
+            if "Paint" in title:
+                try:
+                    window_class = win32gui.GetClassName(hwnd)
+                except Exception:
+                    window_class = "Unknown"
+                results.append((hwnd, title, window_class))
+                
+    paint_windows = []
+    win32gui.EnumWindows(enum_callback, paint_windows)
+    # An empty result is not cached, so a window that is still starting up is picked up on the next call
+    _enum_cache = (now, paint_windows) if paint_windows else (0.0, [])
+    return paint_windows
+
+def _invalidate_enum_cache():
+    """Forget the memoized window enumeration after Paint is launched or closed"""
+    global _enum_cache
+    _enum_cache = (0.0, [])
+
+def _get_window_rect(hwnd):
+    """
+    GetWindowRect with a short-lived cache, so the several lookups made for a
+    single high-level drawing request share one system call.
+    """
+    global _cached_rect
+    cached_hwnd, cached_rect, timestamp = _cached_rect
+    now = time.perf_counter()
+    if cached_hwnd == hwnd and cached_rect is not None and now - timestamp < WINDOW_RECT_TTL:
+        return cached_rect
+    rect = win32gui.GetWindowRect(hwnd)
+    _cached_rect = (hwnd, rect, now)
+    return rect
+
+def _invalidate_window_rect():
+    """Drop the cached window rectangle and canvas info after moving or resizing the window"""
+    global _cached_rect, _canvas_cache
+    _cached_rect = (None, None, 0.0)
+    _canvas_cache = (None, None)
+
+
+def _get_dib(width, height):
+    """
+    Return the cached 32bpp top-down DIB section, recreating it only when the
+    size changes. Callers must hold _dib_lock.
+    """
+    global _dib
+    if _dib is not None and _dib[5:] == (width, height):
+        return _dib
+    _free_dib()
+    
+    screen_dc = _user32.GetDC(None)
+    mem_dc = _gdi32.CreateCompatibleDC(screen_dc)
+    bmi = BITMAPINFO()
+    bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+    bmi.bmiHeader.biWidth = width
+    bmi.bmiHeader.biHeight = -height  # Negative height: rows are stored top-down
+    bmi.bmiHeader.biPlanes = 1
+    bmi.bmiHeader.biBitCount = 32
+    bmi.bmiHeader.biCompression = BI_RGB
+    bits = ctypes.c_void_p()
+    hbitmap = _gdi32.CreateDIBSection(mem_dc, ctypes.byref(bmi), DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+    if not hbitmap:
+        _gdi32.DeleteDC(mem_dc)
+        _user32.ReleaseDC(None, screen_dc)
+        raise ctypes.WinError()
+    old_bitmap = _gdi32.SelectObject(mem_dc, hbitmap)
+    _dib = (screen_dc, mem_dc, hbitmap, old_bitmap, bits, width, height)
+    return _dib
+
+def _free_dib():
+    """Free the cached DIB and its device contexts. Callers must hold _dib_lock."""
+    global _dib
+    if _dib is None:
+        return
+    screen_dc, mem_dc, hbitmap, old_bitmap = _dib[:4]
+    _gdi32.SelectObject(mem_dc, old_bitmap)
+    _gdi32.DeleteObject(hbitmap)
+    _gdi32.DeleteDC(mem_dc)
+    _user32.ReleaseDC(None, screen_dc)
+    _dib = None
+
+def _release_dib():
+    """Free the cached capture DIB and its device contexts"""
+    with _dib_lock:
+        _free_dib()
+
+def _grab_gdi(region=None):
+    """
+    BitBlt the screen region (an mss-style dict, or the whole monitor) into
+    the cached DIB and return it as an (H, W, 3) RGB array.
+    """
+    region = region or _monitor
+    width, height = region['width'], region['height']
+    with _dib_lock:
+        screen_dc, mem_dc, _, _, bits = _get_dib(width, height)[:5]
+        if not _gdi32.BitBlt(mem_dc, 0, 0, width, height, screen_dc, region['left'], region['top'], SRCCOPY):
+            raise ctypes.WinError()
+        # string_at copies the pixels, so the next grab can reuse the DIB
+        raw = ctypes.string_at(bits, width * height * 4)
+    return np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 4)[..., 2::-1]
+
+def _changed_mask(before, after, threshold=PIXEL_DIFF_THRESHOLD):
+    """Boolean mask of pixels whose summed RGB difference exceeds the threshold"""
+    delta = np.abs(before.astype(np.int16) - after).sum(axis=-1)
+    return delta > threshold
+
+def _roi_region(x1, y1, x2, y2, margin=5):
+    """
+    mss region covering the box (x1, y1)-(x2, y2) plus a margin, or None when
+    the box exceeds ~30% of the screen and one full grab is cheaper.
+    """
+    # Clamp all four edges to the monitor so session views and captures keep the same shape
+    left = max(min(x1, x2) - margin, _monitor['left'])
+    top = max(min(y1, y2) - margin, _monitor['top'])
+    right = min(max(x1, x2) + margin, _monitor['left'] + _monitor['width'])
+    bottom = min(max(y1, y2) + margin, _monitor['top'] + _monitor['height'])
+    width = right - left
+    height = bottom - top
+    if width <= 0 or height <= 0 or width * height >= 0.3 * _monitor['width'] * _monitor['height']:
+        return None
+    return {'left': left, 'top': top, 'width': width, 'height': height}
+
+def _save_png(image, path):
+    """
+    Write an (H, W, 3) RGB array captured by _grab_gdi to a PNG file.
+    Uses fast compression since these are throwaway debug images.
+    """
+    height, width = image.shape[:2]
+    Image.frombuffer('RGB', (width, height), np.ascontiguousarray(image), 'raw', 'RGB', 0, 1).save(
+        path, compress_level=1)
+
+class DrawSession:
+    """
+    Shares one full-screen "before" capture between consecutive draw calls.
+    Each draw call writes its "after" pixels back, so the capture stays
+    current for the next primitive.
+    
+        with DrawSession() as session:
+            draw_rectangle(100, 100, 300, 200, session=session)
+            draw_circle(500, 400, 50, session=session)
+    """
+    def __enter__(self):
+        # Same GDI grabber as the per-call captures, so before/after pixels are comparable
+        self.before = _grab_gdi().copy()
+        return self
+        
+    def __exit__(self, exc_type, exc, tb):
+        self.before = None
+        return False
+        
+    def _view(self, region):
+        if region is None:
+            return self.before
+        top = region['top'] - _monitor['top']
+        left = region['left'] - _monitor['left']
+        return self.before[top:top + region['height'], left:left + region['width']]
+        
+    def capture(self, region=None):
+        """Copy of the shared capture for an mss-style region (or the whole monitor)"""
+        return self._view(region).copy()
+        
+    def update(self, region, after):
+        """Record the pixels captured after a draw call"""
+        self._view(region)[...] = after
+
+def _mouse_move_input(x, y):
+    """Build an absolute mouse-move INPUT for screen coordinates (x, y)"""
+    screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
+    screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
+    mi = MOUSEINPUT(dx=(x * 65535) // (screen_width - 1),
+                    dy=(y * 65535) // (screen_height - 1),
+                    dwFlags=MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE)
+    return INPUT(type=INPUT_MOUSE, union=_INPUTUNION(mi=mi))
+
+def _mouse_button_input(flags):
+    """Build a mouse button INPUT (MOUSEEVENTF_LEFTDOWN / MOUSEEVENTF_LEFTUP)"""
+    return INPUT(type=INPUT_MOUSE, union=_INPUTUNION(mi=MOUSEINPUT(dwFlags=flags)))
+
+def _send_mouse_click_at(x, y):
+    """Move to (x, y) and left-click with a single SendInput call"""
+    return _send_inputs([_mouse_move_input(x, y),
+                         _mouse_button_input(MOUSEEVENTF_LEFTDOWN),
+                         _mouse_button_input(MOUSEEVENTF_LEFTUP)])
+
+def _move(x, y):
+    """Move the cursor to screen coordinates (x, y) without tweening"""
+    _user32.SetCursorPos(int(x), int(y))
+
+def _down():
+    """Press the left mouse button at the current cursor position"""
+    _user32.mouse_event(MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
+
+def _up():
+    """Release the left mouse button at the current cursor position"""
+    _user32.mouse_event(MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
+
+def _settle(ms=50):
+    """Give Paint time to process the input queued so far"""
+    time.sleep(ms / 1000)
+
+def _key_input(vk, key_up=False):
+    """Build a virtual-key keyboard INPUT"""
+    ki = KEYBDINPUT(wVk=vk, dwFlags=KEYEVENTF_KEYUP if key_up else 0)
+    return INPUT(type=INPUT_KEYBOARD, union=_INPUTUNION(ki=ki))
+
+def _key_press_inputs(*vks):
+    """Build down/up INPUT pairs for each virtual key, pressed in sequence"""
+    inputs = []
+    for vk in vks:
+        inputs.append(_key_input(vk))
+        inputs.append(_key_input(vk, key_up=True))
+    return inputs
+
+def _unicode_text_inputs(text):
+    """
+    Build KEYEVENTF_UNICODE down/up INPUT pairs that type text directly,
+    independent of the keyboard layout. Newlines are sent as Enter.
+    """
+    inputs = []
+    for ch in text:
+        if ch == '\n':
+            inputs.extend(_key_press_inputs(win32con.VK_RETURN))
+            continue
+        # Characters outside the BMP are sent as their two UTF-16 surrogates
+        encoded = ch.encode('utf-16-le')
+        for i in range(0, len(encoded), 2):
+            code_unit = int.from_bytes(encoded[i:i + 2], 'little')
+            for flags in (KEYEVENTF_UNICODE, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP):
+                ki = KEYBDINPUT(wVk=0, wScan=code_unit, dwFlags=flags)
+                inputs.append(INPUT(type=INPUT_KEYBOARD, union=_INPUTUNION(ki=ki)))
+    return inputs
+
+def _alt_combo_inputs(vk):
+    """Build INPUTs for Alt+<vk>"""
+    return [_key_input(win32con.VK_MENU), _key_input(vk),
+            _key_input(vk, key_up=True), _key_input(win32con.VK_MENU, key_up=True)]
+
+def _send_inputs(inputs):
+    """Dispatch a list of INPUT events with a single SendInput call"""
+    input_array = (INPUT * len(inputs))(*inputs)
+    sent = _user32.SendInput(len(inputs), input_array, ctypes.sizeof(INPUT))
+    if sent != len(inputs):
+        logging.error("SendInput delivered %s of %s events", sent, len(inputs))
+        return False
+    return True
+
+def _get_menu_commands(hwnd):
+    """
+    Map normalized menu item captions to WM_COMMAND ids for a Paint window.
+    Returns an empty dict for Paint versions without a classic menu bar.
+    """
+    if hwnd in _menu_commands:
+        return _menu_commands[hwnd]
+        
+    commands = {}
+    
+    def walk(hmenu):
+        for pos in range(win32gui.GetMenuItemCount(hmenu)):
+            submenu = win32gui.GetSubMenu(hmenu, pos)
+            if submenu:
+                walk(submenu)
+                continue
+            command_id = win32gui.GetMenuItemID(hmenu, pos)
+            if command_id in (0, -1, 0xFFFFFFFF):
+                continue
+            caption = ctypes.create_unicode_buffer(256)
+            _user32.GetMenuStringW(hmenu, pos, caption, len(caption), win32con.MF_BYPOSITION)
+            name = caption.value.split('\t')[0].replace('&', '').strip().lower()
+            if name:
+                commands[name] = command_id
+                
+    hmenu = win32gui.GetMenu(hwnd)
+    if hmenu:
+        walk(hmenu)
+    _menu_commands[hwnd] = commands
+    return commands
+
+def _post_menu_command(item_names):
+    """
+    Post WM_COMMAND for the first matching menu item of classic Paint.
+    Returns False when Paint has no matching menu item, so callers can fall
+    back to the mouse-driven path.
+    """
+    paint_window = find_paint_window()
+    if not paint_window or win32gui.GetClassName(paint_window) != "MSPaintApp":
+        return False
+        
+    commands = _get_menu_commands(paint_window)
+    for name in item_names:
+        if name in commands:
+            win32gui.PostMessage(paint_window, win32con.WM_COMMAND, commands[name], 0)
+            logging.info("Posted WM_COMMAND %s for menu item '%s'", commands[name], name)
+            return True
+    return False
+
+def _compute_layout(hwnd, window_rect):
+    """Compute tool and canvas positions for the given Paint window rectangle"""
+    win_x, win_y, win_right, win_bottom = window_rect
+    win_width = win_right - win_x
+    
+    shapes_btn_x = win_x + int(win_width * SHAPES_BUTTON_REL_X)
+    shapes_btn_y = win_y + TOOLBAR_BUTTON_Y
+    shape_xy = {
+        name: (shapes_btn_x + grid_x * SHAPE_ITEM_WIDTH,
+               shapes_btn_y + SHAPE_DROPDOWN_OFFSET + grid_y * SHAPE_ITEM_HEIGHT)
+        for name, (grid_x, grid_y) in SHAPE_GRID.items()
+    }
+    canvas_rect = (
+        win_x + CANVAS_LEFT_MARGIN,
+        win_y + CANVAS_TITLE_HEIGHT + CANVAS_RIBBON_HEIGHT,
+        win_right - int(win_width * CANVAS_RIGHT_MARGIN_REL),
+        win_bottom - CANVAS_STATUS_HEIGHT
+    )
+    
+    return _ToolLayout(
+        hwnd=hwnd,
+        window_rect=window_rect,
+        shapes_btn_xy=(shapes_btn_x, shapes_btn_y),
+        shape_xy=shape_xy,
+        brush_btn_xy=(win_x + int(win_width * BRUSH_BUTTON_REL_X), win_y + TOOLBAR_BUTTON_Y),
+        neutral_xy=(win_x + win_width // 2, win_y + 160),
+        canvas_rect=canvas_rect
+    )
+
+def _get_layout():
+    """
+    Return the cached tool layout for the Paint window, recomputing it only
+    when the window handle or rectangle has changed.
+    """
+    global _layout
+    paint_window = find_paint_window()
+    if not paint_window:
         return None
+        
+    window_rect = _get_window_rect(paint_window)
+    if _layout is None or _layout.hwnd != paint_window or _layout.window_rect != window_rect:
+        _layout = _compute_layout(paint_window, window_rect)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Computed Paint tool layout for window at %s", window_rect)
+    return _layout
+
+def _reset_paint_state():
+    """Forget the tracked tool and color selection"""
+    _paint_state['active_tool'] = None
+    _paint_state['color'] = None
+
+def _clear_active_tool(delay):
+    """Press Esc to cancel the active tool, including one the user picked by hand"""
+    pyautogui.press('esc')
+    time.sleep(delay)
+    _paint_state['active_tool'] = None
+
+def _commit_shape(delay=0.05):
+    """Press Esc so the last drawn shape is committed and the next drag can't move or resize it"""
+    pyautogui.press('esc')
+    time.sleep(delay)
 
 def ensure_paint_focused():
     """Ensure Paint window is focused and maximized"""
@@ -139,45 +693,54 @@ def ensure_paint_focused():
             logging.error("Paint window not found")
             return False
             
+        # Fast path: Paint is already the foreground, non-minimized window
+        if win32gui.GetForegroundWindow() == paint_window and not win32gui.IsIconic(paint_window):
+            return True
+            
         # Get window info
-        window_rect = win32gui.GetWindowRect(paint_window)
-        logging.info(f"Found Paint window at {window_rect}")
-        
-        # Multiple attempts to focus window
-        for attempt in range(3):
+        window_rect = _get_window_rect(paint_window)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Found Paint window at %s", window_rect)
+        
+        # Restore, maximize and show in a single transition
+        win32gui.ShowWindow(paint_window, win32con.SW_SHOWMAXIMIZED)
+        _invalidate_window_rect()
+        
+        # Attach to the foreground thread's input queue so Windows lets this
+        # thread change the foreground window on the first try
+        foreground_window = win32gui.GetForegroundWindow()
+        current_thread = win32api.GetCurrentThreadId()
+        foreground_thread = 0
+        if foreground_window:
+            foreground_thread, _ = win32process.GetWindowThreadProcessId(foreground_window)
+        attached = False
+        if foreground_thread and foreground_thread != current_thread:
             try:
-                # Restore window if minimized
-                win32gui.ShowWindow(paint_window, win32con.SW_RESTORE)
-                time.sleep(0.5)
-                
-                # Set foreground window
-                win32gui.SetForegroundWindow(paint_window)
-                time.sleep(0.5)
-                
-                # Maximize window
-                win32gui.ShowWindow(paint_window, win32con.SW_MAXIMIZE)
-                time.sleep(0.5)
-                
-                # Verify window is active
-                active_window = win32gui.GetForegroundWindow()
-                if active_window == paint_window:
-                    # Additional verification - try to get window text
-                    try:
-                        win32gui.GetWindowText(active_window)
-                        logging.info("Paint window successfully focused")
-                        return True
-                    except:
-                        continue
-                        
+                win32process.AttachThreadInput(current_thread, foreground_thread, True)
+                attached = True
             except Exception as e:
-                logging.warning(f"Focus attempt {attempt + 1} failed: {str(e)}")
-                time.sleep(1)
-                
-        logging.error("Failed to focus Paint window after multiple attempts")
+                logging.warning("AttachThreadInput failed: %s", e)
+        try:
+            win32gui.SetForegroundWindow(paint_window)
+        finally:
+            if attached:
+                win32process.AttachThreadInput(current_thread, foreground_thread, False)
+        
+        # Poll briefly until the window becomes the foreground window
+        deadline = time.time() + 0.2
+        while True:
+            if win32gui.GetForegroundWindow() == paint_window:
+                logging.info("Paint window successfully focused")
+                return True
+            if time.time() >= deadline:
+                break
+            time.sleep(0.01)
+            
+        logging.error("Failed to focus Paint window")
         return False
         
     except Exception as e:
-        logging.error(f"Error in ensure_paint_focused: {str(e)}")
+        logging.error("Error in ensure_paint_focused: %s", e)
         return False
 
 def open_paint():
@@ -190,58 +753,55 @@ def open_paint():
         print("Found existing Paint window and focused it")
         return True
     
-    # Try opening Paint using Windows start command (more reliable)
     try:
-        print("Opening classic Paint using Windows start command...")
-        logging.info("Launching Paint using Windows start command")
-        
-        # Use Windows start command to launch mspaint.exe
-        os.system('start mspaint')
-        time.sleep(2)
-        
-        # Try to focus the window
-        for attempt in range(5):  # Try multiple times with longer delays
-            if ensure_paint_focused():
-                # Verify this is classic Paint
-                paint_window = find_paint_window()
-                if paint_window:
-                    window_class = win32gui.GetClassName(paint_window)
-                    if window_class == "MSPaintApp":
-                        print("Classic Paint opened and focused successfully")
-                        logging.info(f"Classic Paint opened with window class: {window_class}")
-                        return True
-                    else:
-                        print(f"Warning: Opened Paint with class {window_class}, not classic MSPaintApp")
-                        # Continue anyway
-                        return True
-            
-            # Wait longer between attempts
-            time.sleep(1 + attempt)
-            logging.info(f"Paint focus attempt {attempt+1} failed, retrying...")
+        print("Opening classic Paint...")
+        logging.info("Launching mspaint.exe")
+        
+        # Launch Paint and wait until its message loop is ready for input
+        proc = subprocess.Popen(['mspaint.exe'])
+        _reset_paint_state()
+        _invalidate_enum_cache()
+        _invalidate_window_rect()
+        try:
+            process_handle = win32api.OpenProcess(
+                win32con.PROCESS_QUERY_INFORMATION | win32con.SYNCHRONIZE, False, proc.pid)
+            try:
+                win32event.WaitForInputIdle(process_handle, 5000)
+            finally:
+                win32api.CloseHandle(process_handle)
+        except Exception as e:
+            # The launcher process may already have exited; fall through to polling
+            logging.warning("WaitForInputIdle on Paint failed: %s", e)
+        
+        # Poll for the window every 20ms, up to a 1s deadline
+        paint_window = find_paint_window()
+        deadline = time.perf_counter() + 1.0
+        while not paint_window and time.perf_counter() < deadline:
+            time.sleep(0.02)
+            paint_window = find_paint_window()
+        
+        if paint_window and ensure_paint_focused():
+            # Verify this is classic Paint
+            window_class = win32gui.GetClassName(paint_window)
+            if window_class == "MSPaintApp":
+                print("Classic Paint opened and focused successfully")
+                logging.info("Classic Paint opened with window class: %s", window_class)
+            else:
+                print(f"Warning: Opened Paint with class {window_class}, not classic MSPaintApp")
+                # Continue anyway
+            return True
             
         # If we couldn't focus the window, check if we can find it at all
-        paint_windows = []
-        
-        def enum_callback(hwnd, results):
-            if win32gui.IsWindowVisible(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                if "Paint" in title:
-                    try:
-                        window_class = win32gui.GetClassName(hwnd)
-                        results.append((hwnd, title, window_class))
-                    except:
-                        results.append((hwnd, title, "Unknown"))
-                        
-        win32gui.EnumWindows(enum_callback, paint_windows)
+        paint_windows = _enum_paint_windows()
         
         if paint_windows:
-            logging.info(f"Found Paint windows but couldn't focus: {paint_windows}")
+            logging.info("Found Paint windows but couldn't focus: %s", paint_windows)
             print(f"Paint window found but couldn't be focused")
             return True
                 
     except Exception as e:
         print(f"Failed to open classic Paint: {str(e)}")
-        logging.error(f"Failed to open classic Paint: {str(e)}")
+        logging.error("Failed to open classic Paint: %s", e)
     
     print("Failed to open Paint")
     return False
@@ -252,89 +812,68 @@ def select_shape_tool(shape_type='rectangle'):
     Supported shapes: rectangle, circle (ellipse), line, triangle
     """
     try:
-        logging.info(f"Selecting shape tool: {shape_type}")
+        logging.info("Selecting shape tool: %s", shape_type)
         
-        # Get Paint window handle
-        paint_window = find_paint_window()
-        if not paint_window:
-            logging.error("Failed to find Paint window")
-            return False
-            
         # Ensure Paint is in focus
         if not ensure_paint_focused():
             logging.error("Failed to focus Paint window")
             return False
         
-        # Get window dimensions
-        window_rect = win32gui.GetWindowRect(paint_window)
-        win_x, win_y, win_right, win_bottom = window_rect
-        win_width = win_right - win_x
-        win_height = win_bottom - win_y
-        logging.info(f"Paint window: {win_width}x{win_height} at ({win_x},{win_y})")
+        # The tool itself only needs selecting if this shape isn't already active,
+        # but the previous shape always has to be committed first
+        if _paint_state['active_tool'] == shape_type.lower():
+            _commit_shape()
+            return True
+        
+        # Classic Paint with a menu bar takes the tool as a WM_COMMAND
+        _commit_shape()
+        if _post_menu_command(SHAPE_MENU_NAMES.get(shape_type.lower(), (shape_type.lower(),))):
+            _paint_state['active_tool'] = shape_type.lower()
+            return True
+        
+        # Get cached tool positions for the current window placement
+        layout = _get_layout()
+        if not layout:
+            logging.error("Failed to find Paint window")
+            return False
         
         # Clear any active tool selection
-        pyautogui.press('esc')
-        time.sleep(1)
+        _clear_active_tool(1)
         
-        # Based on the Windows 11 Paint UI screenshot:
         # Shapes button is visible in the toolbar, around 1/3 from the left
-        shapes_button_rel_x = 0.35  # Relative position from left edge (35%)
-        shapes_button_y = win_y + 55  # Fixed Y position from top
-        
-        shapes_button_x = win_x + int(win_width * shapes_button_rel_x)
+        shapes_button_x, shapes_button_y = layout.shapes_btn_xy
         
-        logging.info(f"Clicking Shapes button at ({shapes_button_x}, {shapes_button_y})")
-        # Move to shapes button with visual feedback
-        pyautogui.moveTo(shapes_button_x, shapes_button_y, duration=0.5)
-        time.sleep(0.5)
-        pyautogui.click()
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Clicking Shapes button at (%s, %s)", shapes_button_x, shapes_button_y)
+        if not _send_mouse_click_at(shapes_button_x, shapes_button_y):
+            return False
         time.sleep(1.5)  # Longer wait for shapes menu to appear
         
-        # Map shape names to relative positions in the dropdown grid
-        # These positions are based on Windows 11 Paint UI
-        shape_positions = {
-            'line': (0, 0),         # First item, first row
-            'curve': (1, 0),        # Second item, first row
-            'rectangle': (0, 1),    # First item, second row
-            'square': (1, 1),       # Second item, second row
-            'oval': (2, 1),         # Third item, second row
-            'circle': (3, 1),       # Fourth item, second row
-            'triangle': (0, 2),     # First item, third row
-        }
-        
         # Check if requested shape is supported
-        if shape_type.lower() not in shape_positions:
-            logging.warning(f"Shape type '{shape_type}' not explicitly supported, defaulting to rectangle")
+        if shape_type.lower() not in layout.shape_xy:
+            logging.warning("Shape type '%s' not explicitly supported, defaulting to rectangle", shape_type)
             shape_type = 'rectangle'
         
-        # Get grid position for the selected shape
-        grid_x, grid_y = shape_positions[shape_type.lower()]
-        
-        # Calculate pixel offset from the shapes button
-        # Each grid item is approximately 40px wide and 35px tall
-        item_width = 40
-        item_height = 35
-        
-        shape_x = shapes_button_x + (grid_x * item_width)
-        shape_y = shapes_button_y + 40 + (grid_y * item_height)  # 40px initial dropdown offset
+        # Dropdown item positions are precomputed per window layout
+        shape_x, shape_y = layout.shape_xy[shape_type.lower()]
         
-        logging.info(f"Clicking {shape_type} shape at ({shape_x}, {shape_y})")
-        pyautogui.moveTo(shape_x, shape_y, duration=0.5)
-        time.sleep(0.5)
-        pyautogui.click()
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Clicking %s shape at (%s, %s)", shape_type, shape_x, shape_y)
+        if not _send_mouse_click_at(shape_x, shape_y):
+            return False
         time.sleep(1.5)
         
         # Move to neutral area to complete selection
-        neutral_x = win_x + win_width//2
-        neutral_y = win_y + 160
+        neutral_x, neutral_y = layout.neutral_xy
         pyautogui.moveTo(neutral_x, neutral_y, duration=0.3)
         time.sleep(0.5)
         
-        logging.info(f"Successfully selected {shape_type} shape tool")
+        _paint_state['active_tool'] = shape_type.lower()
+        logging.info("Successfully selected %s shape tool", shape_type)
         return True
         
     except Exception as e:
-        logging.error(f"Error selecting shape tool: {str(e)}", exc_info=True)
+        logging.error("Error selecting shape tool: %s", e, exc_info=True)
         return False
 
 def select_brush_tool():
@@ -344,36 +883,34 @@ def select_brush_tool():
     try:
         logging.info("Selecting brush tool")
         
-        # Get Paint window handle
-        paint_window = find_paint_window()
-        if not paint_window:
-            logging.error("Failed to find Paint window")
-            return False
-            
         # Ensure Paint is in focus
         if not ensure_paint_focused():
             logging.error("Failed to focus Paint window")
             return False
         
-        # Get window dimensions
-        window_rect = win32gui.GetWindowRect(paint_window)
-        win_x, win_y, win_right, win_bottom = window_rect
-        win_width = win_right - win_x
-        win_height = win_bottom - win_y
-        logging.info(f"Paint window: {win_width}x{win_height} at ({win_x},{win_y})")
+        # Nothing to do if the brush is already the active tool
+        if _paint_state['active_tool'] == 'brush':
+            return True
+        
+        # Classic Paint with a menu bar takes the tool as a WM_COMMAND
+        if _post_menu_command(('brush', 'brushes')):
+            _paint_state['active_tool'] = 'brush'
+            return True
+        
+        # Get cached tool positions for the current window placement
+        layout = _get_layout()
+        if not layout:
+            logging.error("Failed to find Paint window")
+            return False
         
         # Clear any active tool selection
-        pyautogui.press('esc')
-        time.sleep(0.5)
+        _clear_active_tool(0.5)
         
-        # Calculate brush tool position (typically in the Brushes section)
         # In typical Paint layout, brushes are located around 15% from the left in the toolbar
-        brush_button_rel_x = 0.15  # Relative position from left edge (15%)
-        brush_button_y = win_y + 55  # Fixed Y position from top
+        brush_button_x, brush_button_y = layout.brush_btn_xy
         
-        brush_button_x = win_x + int(win_width * brush_button_rel_x)
-        
-        logging.info(f"Clicking Brush button at ({brush_button_x}, {brush_button_y})")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Clicking Brush button at (%s, %s)", brush_button_x, brush_button_y)
         
         # Move to brush button with visual feedback
         highlight_click_location(brush_button_x, brush_button_y, duration=0.3)
@@ -386,38 +923,32 @@ def select_brush_tool():
         first_brush_x = brush_button_x
         first_brush_y = brush_button_y + 40  # 40px down from button
         
-        logging.info(f"Selecting first brush at ({first_brush_x}, {first_brush_y})")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Selecting first brush at (%s, %s)", first_brush_x, first_brush_y)
         pyautogui.moveTo(first_brush_x, first_brush_y, duration=0.3)
         time.sleep(0.2)
         pyautogui.click()
         time.sleep(0.5)
         
         # Move to neutral area to complete selection
-        neutral_x = win_x + win_width//2
-        neutral_y = win_y + 160
+        neutral_x, neutral_y = layout.neutral_xy
         pyautogui.moveTo(neutral_x, neutral_y, duration=0.2)
         time.sleep(0.2)
         
         # Additional verification - try to click in the canvas area
         canvas_info = get_paint_canvas_info()
         if canvas_info:
-            # Handle both tuple and dictionary formats
-            if isinstance(canvas_info, tuple):
-                canvas_x, canvas_y, canvas_width, canvas_height = canvas_info
-                canvas_center_x = canvas_x + (canvas_width // 2)
-                canvas_center_y = canvas_y + (canvas_height // 2)
-            else:
-                canvas_center_x = canvas_info['left'] + (canvas_info['width'] // 2)
-                canvas_center_y = canvas_info['top'] + (canvas_info['height'] // 2)
-                
+            canvas_center_x = canvas_info.left + (canvas_info.width // 2)
+            canvas_center_y = canvas_info.top + (canvas_info.height // 2)
             pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.2)
             time.sleep(0.2)
         
+        _paint_state['active_tool'] = 'brush'
         logging.info("Successfully selected brush tool")
         return True
         
     except Exception as e:
-        logging.error(f"Error selecting brush tool: {str(e)}", exc_info=True)
+        logging.error("Error selecting brush tool: %s", e, exc_info=True)
         return False
 
 def get_paint_canvas_info():
@@ -425,172 +956,107 @@ def get_paint_canvas_info():
     Get Paint canvas information with accurate boundaries based on Windows UI layout.
     
     Returns:
-        For backwards compatibility, returns a tuple (x, y, width, height) representing 
-        the canvas position and dimensions. The tuple object will also have keys and 
-        values accessible via dict-like access for existing code that expects a dictionary.
+        CanvasInfo namedtuple (left, top, width, height, right, bottom) in screen
+        coordinates, or None if the Paint window could not be found.
     """
+    global _canvas_cache
     try:
-        # Find Paint window using robust method
-        paint_window = find_paint_window()
-        if not paint_window:
+        # Canvas area is derived from the cached window layout
+        layout = _get_layout()
+        if not layout:
             logging.error("Paint window not found")
             return None
             
-        # Get window dimensions
-        window_rect = win32gui.GetWindowRect(paint_window)
-        win_x, win_y, win_right, win_bottom = window_rect
-        win_width = win_right - win_x
-        win_height = win_bottom - win_y
-        
-        logging.info(f"Paint window dimensions: {win_width}x{win_height} at ({win_x}, {win_y})")
-        
-        # Calculate canvas area based on Windows Paint UI
-        title_height = 32       # Top window title bar
-        ribbon_height = 93      # Height of ribbon and toolbars
-        status_height = 26      # Bottom status bar
-        left_margin = 10        # Left margin (minimal in Win11 Paint)
-        right_margin = int(win_width * 0.25)  # Right margin (approx 25% of window width based on screenshot)
-        
-        canvas_left = win_x + left_margin
-        canvas_top = win_y + title_height + ribbon_height
-        canvas_right = win_right - right_margin
-        canvas_bottom = win_bottom - status_height
+        # Reuse the result while the same window is at the same place and size
+        cache_key = (layout.hwnd, layout.window_rect)
+        cached_key, cached_info = _canvas_cache
+        if cached_key == cache_key:
+            return cached_info
+            
+        canvas_left, canvas_top, canvas_right, canvas_bottom = layout.canvas_rect
         
         canvas_width = canvas_right - canvas_left
         canvas_height = canvas_bottom - canvas_top
         
-        # Visualize canvas boundaries with subtle highlights
-        highlight_click_location(canvas_left, canvas_top, duration=0.2)
-        highlight_click_location(canvas_right, canvas_top, duration=0.2)
-        highlight_click_location(canvas_right, canvas_bottom, duration=0.2)
-        highlight_click_location(canvas_left, canvas_bottom, duration=0.2)
-        
-        # Create a special tuple that can also be accessed like a dictionary
-        # This provides backward compatibility with existing code
-        canvas_tuple = (canvas_left, canvas_top, canvas_width, canvas_height)
-        
-        # Add dictionary attributes to the tuple for backward compatibility
-        canvas_dict = {
-            'left': canvas_left,
-            'top': canvas_top,
-            'right': canvas_right,
-            'bottom': canvas_bottom,
-            'width': canvas_width,
-            'height': canvas_height
-        }
-        
-        # Create a class with both tuple and dict access
-        class CanvasInfo(tuple):
-            def __getitem__(self, key):
-                if isinstance(key, str):
-                    return canvas_dict[key]
-                return tuple.__getitem__(self, key)
-                
-            def __contains__(self, key):
-                if isinstance(key, str):
-                    return key in canvas_dict
-                return tuple.__contains__(self, key)
-                
-            def get(self, key, default=None):
-                if isinstance(key, str):
-                    return canvas_dict.get(key, default)
-                return tuple.__getitem__(self, key) if key < len(self) else default
-                
-        # Create combined object
-        canvas_info = CanvasInfo(canvas_tuple)
+        canvas_info = CanvasInfo(canvas_left, canvas_top, canvas_width, canvas_height,
+                                 canvas_right, canvas_bottom)
         
-        logging.info(f"Canvas boundaries: {canvas_dict}")
-        logging.info(f"Returning as tuple: {canvas_tuple}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Canvas boundaries: %s", canvas_info)
         
+        _canvas_cache = (cache_key, canvas_info)
         return canvas_info
         
     except Exception as e:
-        logging.error(f"Error getting canvas info: {str(e)}")
+        logging.error("Error getting canvas info: %s", e)
         return None
 
 def select_color(color_name='black'):
-    """Select a color in Paint using keyboard shortcuts and mouse"""
+    """Select a color in Paint by entering its RGB value in the Edit Colors dialog"""
     try:
         if not ensure_paint_focused():
             logging.error("Could not focus Paint window")
             return False
             
-        # Get Paint window dimensions
-        paint_window = find_paint_window()
-        if not paint_window:
-            logging.error("Could not find Paint window")
-            return False
-            
-        window_rect = win32gui.GetWindowRect(paint_window)
-        
-        # Updated color palette coordinates for Windows 11 Paint
-        # Colors are in the toolbar, with black at around 60% from left
-        color_positions = {
-            'black': (0.60, 75),   # Black is in the first row
-            'white': (0.63, 75),   # White is next to black
-            'red': (0.66, 75),     # Red follows
-            'blue': (0.69, 75),    # Then blue
-            'green': (0.72, 75)    # And green
-        }
-        
-        if color_name not in color_positions:
+        if color_name not in COLOR_HEX:
             color_name = 'black'  # Default to black if color not found
             
-        # Calculate absolute coordinates
-        rel_x, fixed_y = color_positions[color_name]
-        window_width = window_rect[2] - window_rect[0]
-        
-        color_x = window_rect[0] + int(window_width * rel_x)
-        color_y = window_rect[1] + fixed_y
+        # Nothing to do if this color is already selected
+        if _paint_state['color'] == color_name:
+            return True
+            
+        hex_value = COLOR_HEX[color_name].lstrip('#')
+        red, green, blue = (int(hex_value[i:i + 2], 16) for i in (0, 2, 4))
         
-        # Try to select color
-        for attempt in range(3):
-            try:
-                # Ensure we're in the right mode
-                pyautogui.press('esc')  # Clear any active tool
-                time.sleep(0.5)
-                
-                # Log the attempt
-                logging.info(f"Attempting to select {color_name} color at ({color_x}, {color_y})")
-                
-                # Move to and click color with visual feedback
-                pyautogui.moveTo(color_x, color_y, duration=0.5)
-                time.sleep(0.5)
-                pyautogui.click()
-                time.sleep(0.5)
-                
-                # Verify color selection by checking if we can click
-                pyautogui.moveTo(color_x + 5, color_y, duration=0.2)
-                time.sleep(0.2)
-                pyautogui.moveTo(color_x, color_y, duration=0.2)
-                
-                logging.info(f"Selected {color_name} color at ({color_x}, {color_y})")
-                return True
-                
-            except Exception as e:
-                logging.warning(f"Color selection attempt {attempt + 1} failed: {str(e)}")
-                time.sleep(1)
-                
-        logging.error(f"Failed to select {color_name} color after multiple attempts")
-        return False
+        # Open Edit Colors via ribbon keytips: Alt, H, E, C
+        if not _send_inputs(_key_press_inputs(win32con.VK_MENU, ord('H'), ord('E'), ord('C'))):
+            logging.error("Failed to send Edit Colors shortcut")
+            return False
+            
+        # Wait for the color dialog to appear
+        deadline = time.time() + 2.0
+        dialog = win32gui.FindWindow("#32770", "Edit Colors")
+        while not dialog and time.time() < deadline:
+            time.sleep(0.02)
+            dialog = win32gui.FindWindow("#32770", "Edit Colors")
+        if not dialog:
+            logging.error("Edit Colors dialog did not appear")
+            return False
+            
+        # Fill the Red / Green / Blue fields and confirm in one batch
+        inputs = []
+        for accelerator, value in ((ord('R'), red), (ord('G'), green), (ord('U'), blue)):
+            inputs += _alt_combo_inputs(accelerator)
+            inputs += _key_press_inputs(*(ord(digit) for digit in str(value)))
+        inputs += _key_press_inputs(win32con.VK_RETURN)
+        
+        if not _send_inputs(inputs):
+            logging.error("Failed to enter %s color values", color_name)
+            return False
+            
+        _paint_state['color'] = color_name
+        logging.info("Selected %s color (%s)", color_name, COLOR_HEX[color_name])
+        return True
         
     except Exception as e:
-        logging.error(f"Error in select_color: {str(e)}")
+        logging.error("Error in select_color: %s", e)
         return False
 
-def draw_shape(start_x, start_y, end_x, end_y, shape_type='rectangle'):
+def draw_shape(start_x, start_y, end_x, end_y, shape_type='rectangle', human=False):
     """
-    Draw a shape in MS Paint with better error handling and visual feedback.
+    Draw a shape in MS Paint with better error handling.
     
     Args:
         start_x, start_y: Starting coordinates for the shape
         end_x, end_y: Ending coordinates for the shape
         shape_type: Type of shape ('rectangle', 'circle', 'triangle')
+        human: If True, interpolate intermediate drag positions instead of
+               jumping straight from start to end
     
     Returns:
         True if successful, False otherwise
     """
-    logging.info(f"Drawing {shape_type} from ({start_x}, {start_y}) to ({end_x}, {end_y})")
+    logging.info("Drawing %s from (%s, %s) to (%s, %s)", shape_type, start_x, start_y, end_x, end_y)
     
     try:
         # Step 1: Ensure Paint is focused
@@ -608,82 +1074,47 @@ def draw_shape(start_x, start_y, end_x, end_y, shape_type='rectangle'):
         if not validate_coordinates(start_x, start_y, end_x, end_y, canvas_info):
             logging.error("Invalid coordinates for drawing - must be within canvas boundaries")
             
-            # Convert tuple to dictionary if needed
-            if isinstance(canvas_info, tuple):
-                canvas_left, canvas_top, canvas_width, canvas_height = canvas_info
-                canvas_right = canvas_left + canvas_width
-                canvas_bottom = canvas_top + canvas_height
-            else:
-                canvas_left = canvas_info['left']
-                canvas_top = canvas_info['top']
-                canvas_right = canvas_info['right']
-                canvas_bottom = canvas_info['bottom']
-                
             # Adjust coordinates to be within canvas if needed
-            start_x = max(canvas_left, min(start_x, canvas_right))
-            start_y = max(canvas_top, min(start_y, canvas_bottom))
-            end_x = max(canvas_left, min(end_x, canvas_right))
-            end_y = max(canvas_top, min(end_y, canvas_bottom))
-            logging.info(f"Adjusted coordinates to: ({start_x}, {start_y}) to ({end_x}, {end_y})")
+            start_x = max(canvas_info.left, min(start_x, canvas_info.right))
+            start_y = max(canvas_info.top, min(start_y, canvas_info.bottom))
+            end_x = max(canvas_info.left, min(end_x, canvas_info.right))
+            end_y = max(canvas_info.top, min(end_y, canvas_info.bottom))
+            logging.info("Adjusted coordinates to: (%s, %s) to (%s, %s)", start_x, start_y, end_x, end_y)
         
         # Step 4: Select the appropriate shape tool
         if not select_shape_tool(shape_type):
-            logging.error(f"Failed to select {shape_type} tool - cannot draw shape")
+            logging.error("Failed to select %s tool - cannot draw shape", shape_type)
             return False
         
-        # Step 5: Move to a neutral position first, then to start position
-        # Get canvas center
-        if isinstance(canvas_info, tuple):
-            canvas_left, canvas_top, canvas_width, canvas_height = canvas_info
-            neutral_x = canvas_left + (canvas_width // 2)
-            neutral_y = canvas_top + (canvas_height // 2)
-        else:
-            neutral_x = (canvas_info['left'] + canvas_info['right']) // 2
-            neutral_y = (canvas_info['top'] + canvas_info['bottom']) // 2
-        
-        # Move to neutral position first
-        pyautogui.moveTo(neutral_x, neutral_y, duration=0.5)
-        time.sleep(0.5)
-        
-        # Log starting position
-        logging.info(f"Moving to start position ({start_x}, {start_y})")
-        
-        # Step 6: Move to start position with visual feedback
-        highlight_click_location(start_x, start_y, duration=0.3)
-        pyautogui.moveTo(start_x, start_y, duration=0.7)
-        time.sleep(0.5)
-        
-        # Step 7: Press and hold mouse button
-        pyautogui.mouseDown()
-        time.sleep(0.5)  # Hold briefly
-        
-        # Log ending position
-        logging.info(f"Moving to end position ({end_x}, {end_y})")
+        # Step 5: Press at start, drag to end and release as one SendInput batch
+        logging.info("Dragging from (%s, %s) to (%s, %s)", start_x, start_y, end_x, end_y)
+        inputs = [_mouse_move_input(start_x, start_y),
+                  _mouse_button_input(MOUSEEVENTF_LEFTDOWN)]
+        if human:
+            # Interpolated drag path, still delivered in the same batch
+            steps = 15
+            for i in range(1, steps):
+                inputs.append(_mouse_move_input(start_x + (end_x - start_x) * i // steps,
+                                                start_y + (end_y - start_y) * i // steps))
+        inputs.append(_mouse_move_input(end_x, end_y))
+        inputs.append(_mouse_button_input(MOUSEEVENTF_LEFTUP))
+        
+        if not _send_inputs(inputs):
+            logging.error("Failed to send drag input for %s", shape_type)
+            return False
+        time.sleep(0.1)
         
-        # Step 8: Move to end position with smooth motion
-        pyautogui.moveTo(end_x, end_y, duration=1.0)
-        time.sleep(0.5)  # Hold briefly
+        # Step 6: Move away from the shape to avoid unintended interactions
+        away_x = canvas_info.left + (canvas_info.width // 2)
+        away_y = canvas_info.top - 50  # Move above the canvas
         
-        # Step 9: Release mouse button
-        pyautogui.mouseUp()
-        time.sleep(0.5)
-        
-        # Step 10: Move away from the shape to avoid unintended interactions
-        if isinstance(canvas_info, tuple):
-            canvas_left, canvas_top, canvas_width, canvas_height = canvas_info
-            away_x = canvas_left + (canvas_width // 2)
-            away_y = canvas_top - 50  # Move above the canvas
-        else:
-            away_x = canvas_info['left'] + (canvas_info['width'] // 2)
-            away_y = canvas_info['top'] - 50  # Move above the canvas
-            
         pyautogui.moveTo(away_x, away_y, duration=0.5)
         
-        logging.info(f"Successfully drew {shape_type}")
+        logging.info("Successfully drew %s", shape_type)
         return True
         
     except Exception as e:
-        logging.error(f"Error drawing shape: {str(e)}", exc_info=True)
+        logging.error("Error drawing shape: %s", e, exc_info=True)
         # Emergency release of mouse button in case of error
         pyautogui.mouseUp()
         return False
@@ -695,53 +1126,86 @@ def validate_coordinates(start_x, start_y, end_x, end_y, canvas_info):
     Args:
         start_x, start_y: Starting coordinates for the shape
         end_x, end_y: Ending coordinates for the shape
-        canvas_info: Tuple (x, y, width, height) or dict with canvas info
+        canvas_info: CanvasInfo namedtuple from get_paint_canvas_info()
         
     Returns:
         True if coordinates are valid, False otherwise
     """
     try:
-        # Handle both dictionary and tuple formats
-        if isinstance(canvas_info, tuple):
-            # Tuple format: (x, y, width, height)
-            canvas_left, canvas_top, canvas_width, canvas_height = canvas_info
-            canvas_right = canvas_left + canvas_width
-            canvas_bottom = canvas_top + canvas_height
-        else:
-            # Dictionary format with 'left', 'top', 'right', 'bottom' keys
-            canvas_left = canvas_info['left']
-            canvas_top = canvas_info['top']
-            canvas_right = canvas_info['right'] 
-            canvas_bottom = canvas_info['bottom']
-        
-        # Check if all coordinates are within canvas boundaries
+        # Bounding box of the shape must lie within the canvas
         is_valid = (
-            start_x >= canvas_left and start_x <= canvas_right and
-            start_y >= canvas_top and start_y <= canvas_bottom and
-            end_x >= canvas_left and end_x <= canvas_right and
-            end_y >= canvas_top and end_y <= canvas_bottom
+            canvas_info.left <= min(start_x, end_x) and max(start_x, end_x) <= canvas_info.right and
+            canvas_info.top <= min(start_y, end_y) and max(start_y, end_y) <= canvas_info.bottom
         )
         
         if not is_valid:
             logging.warning(
-                f"Coordinates ({start_x}, {start_y}) to ({end_x}, {end_y}) " +
-                f"are outside canvas boundaries: left={canvas_left}, " +
-                f"top={canvas_top}, right={canvas_right}, " +
-                f"bottom={canvas_bottom}"
+                "Coordinates (%s, %s) to (%s, %s) are outside canvas boundaries: "
+                "left=%s, top=%s, right=%s, bottom=%s",
+                start_x, start_y, end_x, end_y,
+                canvas_info.left, canvas_info.top, canvas_info.right, canvas_info.bottom
             )
             
         return is_valid
     except Exception as e:
-        logging.error(f"Error validating coordinates: {str(e)}")
+        logging.error("Error validating coordinates: %s", e)
+        return False
+
+def _verify_rectangle(before, after, roi, corners):
+    """Check that the rectangle's perimeter changed between the before and after captures"""
+    try:
+        screen_x1, screen_y1, screen_x2, screen_y2 = corners
+        
+        # Identical captures mean nothing was drawn, so skip the per-pixel diff
+        if np.array_equal(before, after):
+            pixels_changed = 0
+        else:
+            # Check the perimeter of the rectangle for changes, sampling every 10px
+            # Indices are relative to the captured region
+            origin_x, origin_y = (roi['left'], roi['top']) if roi else (_monitor['left'], _monitor['top'])
+            x_lo, x_hi = min(screen_x1, screen_x2) - origin_x, max(screen_x1, screen_x2) - origin_x
+            y_lo, y_hi = min(screen_y1, screen_y2) - origin_y, max(screen_y1, screen_y2) - origin_y
+            
+            # Gather all four edges into one index pair and compare them in a single pass
+            xs = np.arange(x_lo, x_hi, 10)
+            ys = np.arange(y_lo, y_hi, 10)
+            rows = np.concatenate((np.full(xs.size, y_lo), np.full(xs.size, y_hi), ys, ys))
+            cols = np.concatenate((xs, xs, np.full(ys.size, x_lo), np.full(ys.size, x_hi)))
+            pixels_changed = int(_changed_mask(before[rows, cols], after[rows, cols]).sum())
+        
+        logging.info("Detected %s changed pixels around rectangle boundaries", pixels_changed)
+        
+        if pixels_changed > 5:
+            logging.info("Rectangle drawing verified successful - detected pixel changes")
+            return True
+        else:
+            logging.warning("Few or no pixel changes detected, rectangle may not have been drawn correctly")
+            
+            # Save screenshots for debug purposes
+            debug_dir = os.path.join(log_dir, "debug_screenshots")
+            os.makedirs(debug_dir, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            before_path = os.path.join(debug_dir, f"rectangle_before_{timestamp}.png")
+            after_path = os.path.join(debug_dir, f"rectangle_after_{timestamp}.png")
+            _save_png(before, before_path)
+            _save_png(after, after_path)
+            logging.info("Saved debug screenshots to %s and %s", before_path, after_path)
+            return False
+            
+    except Exception as e:
+        logging.error("Error verifying rectangle: %s", e, exc_info=True)
         return False
 
-def draw_rectangle(x1, y1, x2, y2):
+def draw_rectangle(x1, y1, x2, y2, session=None):
     """
     Draw a rectangle in Windows 11 Paint from (x1,y1) to (x2,y2)
     Coordinates are relative to the canvas
+    Pass a DrawSession to reuse its screen capture instead of grabbing a new one
+    
+    Returns True if pixel changes were detected along the rectangle's edges
     """
     try:
-        logging.info(f"Drawing rectangle from ({x1}, {y1}) to ({x2}, {y2})")
+        logging.info("Drawing rectangle from (%s, %s) to (%s, %s)", x1, y1, x2, y2)
         
         # Step 1: Ensure Paint is focused
         if not ensure_paint_focused():
@@ -758,171 +1222,93 @@ def draw_rectangle(x1, y1, x2, y2):
         # If coordinates are small numbers, assume they're relative to canvas
         # Otherwise assume they're already screen coordinates
         if max(x1, y1, x2, y2) < 1000:  # Likely canvas-relative
-            screen_x1 = canvas_info['left'] + x1
-            screen_y1 = canvas_info['top'] + y1
-            screen_x2 = canvas_info['left'] + x2
-            screen_y2 = canvas_info['top'] + y2
-            logging.info(f"Converting canvas coordinates: ({x1},{y1}) -> ({screen_x1},{screen_y1}), ({x2},{y2}) -> ({screen_x2},{screen_y2})")
+            screen_x1 = canvas_info.left + x1
+            screen_y1 = canvas_info.top + y1
+            screen_x2 = canvas_info.left + x2
+            screen_y2 = canvas_info.top + y2
+            logging.info("Converting canvas coordinates: (%s,%s) -> (%s,%s), (%s,%s) -> (%s,%s)", x1, y1, screen_x1, screen_y1, x2, y2, screen_x2, screen_y2)
         else:
             screen_x1 = x1
             screen_y1 = y1
             screen_x2 = x2
             screen_y2 = y2
-            logging.info(f"Using screen coordinates: ({screen_x1},{screen_y1}) to ({screen_x2},{screen_y2})")
+            logging.info("Using screen coordinates: (%s,%s) to (%s,%s)", screen_x1, screen_y1, screen_x2, screen_y2)
             
         # Step 4: Validate that coordinates are within canvas
-        if not (canvas_info['left'] <= screen_x1 <= canvas_info['right'] and
-                canvas_info['top'] <= screen_y1 <= canvas_info['bottom'] and
-                canvas_info['left'] <= screen_x2 <= canvas_info['right'] and
-                canvas_info['top'] <= screen_y2 <= canvas_info['bottom']):
+        if not (canvas_info.left <= screen_x1 <= canvas_info.right and
+                canvas_info.top <= screen_y1 <= canvas_info.bottom and
+                canvas_info.left <= screen_x2 <= canvas_info.right and
+                canvas_info.top <= screen_y2 <= canvas_info.bottom):
             logging.warning("Drawing coordinates are outside canvas boundaries, adjusting...")
-            screen_x1 = max(canvas_info['left'] + 10, min(screen_x1, canvas_info['right'] - 10))
-            screen_y1 = max(canvas_info['top'] + 10, min(screen_y1, canvas_info['bottom'] - 10))
-            screen_x2 = max(canvas_info['left'] + 10, min(screen_x2, canvas_info['right'] - 10))
-            screen_y2 = max(canvas_info['top'] + 10, min(screen_y2, canvas_info['bottom'] - 10))
-            logging.info(f"Adjusted to: ({screen_x1},{screen_y1}) to ({screen_x2},{screen_y2})")
+            screen_x1, screen_y1, screen_x2, screen_y2 = np.clip(
+                [screen_x1, screen_y1, screen_x2, screen_y2],
+                [canvas_info.left + 10, canvas_info.top + 10] * 2,
+                [canvas_info.right - 10, canvas_info.bottom - 10] * 2
+            ).tolist()
+            logging.info("Adjusted to: (%s,%s) to (%s,%s)", screen_x1, screen_y1, screen_x2, screen_y2)
             
-        # Step 5: Take screenshot before for comparison
-        screenshot_before = pyautogui.screenshot()
+        # Step 5: Take screenshot before for comparison, limited to the rectangle area
+        roi = _roi_region(screen_x1, screen_y1, screen_x2, screen_y2)
+        before = session.capture(roi) if session else _grab_gdi(roi)
         
         # Step 6: Explicitly select the rectangle tool
         if not select_shape_tool('rectangle'):
             logging.error("Failed to select rectangle tool")
             return False
             
-        # Wait to ensure tool is selected
-        time.sleep(1)
-            
-        # Step 7: Move to center of canvas first for better visibility
-        canvas_center_x = (canvas_info['left'] + canvas_info['right']) // 2
-        canvas_center_y = (canvas_info['top'] + canvas_info['bottom']) // 2
-        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.5)
-        time.sleep(0.5)
+        # Step 7: Move to center of canvas first
+        canvas_center_x = (canvas_info.left + canvas_info.right) // 2
+        canvas_center_y = (canvas_info.top + canvas_info.bottom) // 2
+        _move(canvas_center_x, canvas_center_y)
         
-        # Step 8: Move to start position with clear visual feedback
-        logging.info(f"Moving to start position ({screen_x1}, {screen_y1})")
-        pyautogui.moveTo(screen_x1, screen_y1, duration=0.8)
-        
-        # Small circle around start point for visual feedback
-        offset = 5
-        pyautogui.moveRel(offset, 0, duration=0.1)
-        pyautogui.moveRel(0, offset, duration=0.1)
-        pyautogui.moveRel(-offset, 0, duration=0.1)
-        pyautogui.moveRel(0, -offset, duration=0.1)
-        pyautogui.moveTo(screen_x1, screen_y1, duration=0.1)
-        time.sleep(0.5)
+        # Step 8: Move to start position
+        logging.info("Moving to start position (%s, %s)", screen_x1, screen_y1)
+        _move(screen_x1, screen_y1)
         
         # Step 9: Press and hold mouse button
         logging.info("Pressing mouse button down")
-        pyautogui.mouseDown()
-        time.sleep(0.5)
+        _down()
         
-        # Step 10: Move to end position in two stages for better control
-        # First move horizontally to create visible feedback
-        middle_x = screen_x2
-        middle_y = screen_y1
-        logging.info(f"Moving horizontally to ({middle_x}, {middle_y})")
-        pyautogui.moveTo(middle_x, middle_y, duration=0.5)
-        time.sleep(0.2)
-        
-        # Then move vertically to complete the rectangle
-        logging.info(f"Moving vertically to final position ({screen_x2}, {screen_y2})")
-        pyautogui.moveTo(screen_x2, screen_y2, duration=0.5)
-        time.sleep(0.5)
+        # Step 10: Move straight to the end position; the rectangle tool only
+        # uses the press and release points
+        logging.info("Moving to final position (%s, %s)", screen_x2, screen_y2)
+        _move(screen_x2, screen_y2)
+        _settle(20)
         
         # Step 11: Release mouse button
         logging.info("Releasing mouse button")
-        pyautogui.mouseUp()
-        time.sleep(1)
-        
-        # Step 12: Move away from the rectangle for clarity
-        pyautogui.moveTo(canvas_center_x, canvas_center_y - 50, duration=0.3)
-        time.sleep(0.5)
+        _up()
         
-        # Step 13: Take screenshot after to verify changes
-        screenshot_after = pyautogui.screenshot()
+        # Step 12: Move away from the rectangle so the cursor is not captured
+        _move(canvas_center_x, canvas_center_y - 50)
         
-        # Step 14: Verify drawing by comparing screenshots
-        # Check if pixels changed in the rectangle area
-        pixels_changed = 0
-        sample_points = []
+        # Step 13: Capture the result here, before the caller's next primitive
+        # can touch the screen, after letting Paint commit the shape
+        _settle(200)
+        after = _grab_gdi(roi)
+        if session:
+            session.update(roi, after)
         
-        # Check the perimeter of the rectangle for changes
-        # Top and bottom edges
-        for x in range(min(screen_x1, screen_x2), max(screen_x1, screen_x2), 10):
-            # Top edge
-            try:
-                if screenshot_before.getpixel((x, min(screen_y1, screen_y2))) != screenshot_after.getpixel((x, min(screen_y1, screen_y2))):
-                    pixels_changed += 1
-                    if len(sample_points) < 5:
-                        sample_points.append((x, min(screen_y1, screen_y2)))
-            except Exception as e:
-                logging.warning(f"Error checking pixel at ({x}, {min(screen_y1, screen_y2)}): {e}")
-                
-            # Bottom edge
-            try:
-                if screenshot_before.getpixel((x, max(screen_y1, screen_y2))) != screenshot_after.getpixel((x, max(screen_y1, screen_y2))):
-                    pixels_changed += 1
-                    if len(sample_points) < 5:
-                        sample_points.append((x, max(screen_y1, screen_y2)))
-            except Exception as e:
-                logging.warning(f"Error checking pixel at ({x}, {max(screen_y1, screen_y2)}): {e}")
-                
-        # Left and right edges
-        for y in range(min(screen_y1, screen_y2), max(screen_y1, screen_y2), 10):
-            # Left edge
-            try:
-                if screenshot_before.getpixel((min(screen_x1, screen_x2), y)) != screenshot_after.getpixel((min(screen_x1, screen_x2), y)):
-                    pixels_changed += 1
-                    if len(sample_points) < 5:
-                        sample_points.append((min(screen_x1, screen_x2), y))
-            except Exception as e:
-                logging.warning(f"Error checking pixel at ({min(screen_x1, screen_x2)}, {y}): {e}")
-                
-            # Right edge
-            try:
-                if screenshot_before.getpixel((max(screen_x1, screen_x2), y)) != screenshot_after.getpixel((max(screen_x1, screen_x2), y)):
-                    pixels_changed += 1
-                    if len(sample_points) < 5:
-                        sample_points.append((max(screen_x1, screen_x2), y))
-            except Exception as e:
-                logging.warning(f"Error checking pixel at ({max(screen_x1, screen_x2)}, {y}): {e}")
-                
-        logging.info(f"Detected {pixels_changed} changed pixels around rectangle boundaries")
-        
-        # Save screenshots for debug purposes
-        debug_dir = os.path.join(log_dir, "debug_screenshots")
-        os.makedirs(debug_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        before_path = os.path.join(debug_dir, f"rectangle_before_{timestamp}.png")
-        after_path = os.path.join(debug_dir, f"rectangle_after_{timestamp}.png")
-        screenshot_before.save(before_path)
-        screenshot_after.save(after_path)
-        logging.info(f"Saved debug screenshots to {before_path} and {after_path}")
+        # Step 14: Check the rectangle's perimeter for changes
+        return _verify_rectangle(before, after, roi, (screen_x1, screen_y1, screen_x2, screen_y2))
         
-        if pixels_changed > 5:
-            logging.info("Rectangle drawing verified successful - detected pixel changes")
-            return True
-        else:
-            logging.warning("Few or no pixel changes detected, rectangle may not have been drawn correctly")
-            return False
-            
     except Exception as e:
-        logging.error(f"Error drawing rectangle: {str(e)}", exc_info=True)
+        logging.error("Error drawing rectangle: %s", e, exc_info=True)
         # Emergency release of mouse button in case of error
         try:
-            pyautogui.mouseUp()
+            _up()
         except:
             pass
         return False
 
-def draw_circle(x, y, radius):
+def draw_circle(x, y, radius, session=None):
     """
     Draw a circle in MS Paint at the specified center and radius.
-    Takes screenshots before and after to verify drawing was successful.
+    Takes screenshots before and after to verify drawing was successful,
+    reusing the DrawSession capture as the "before" image when one is given.
     """
     try:
-        logging.info(f"Drawing circle at ({x}, {y}) with radius {radius}")
+        logging.info("Drawing circle at (%s, %s) with radius %s", x, y, radius)
         
         # Calculate start and end points for drawing the circle
         start_x = x - radius
@@ -936,7 +1322,7 @@ def draw_circle(x, y, radius):
             return False
             
         # Screenshot before drawing
-        screenshot_before = pyautogui.screenshot()
+        before = session.capture() if session else _grab_gdi()
         time.sleep(0.5)
         
         # Select circle/ellipse tool
@@ -951,56 +1337,47 @@ def draw_circle(x, y, radius):
             return False
             
         # Validate that coordinates are within canvas
-        if (start_x < canvas_info['left'] or start_y < canvas_info['top'] or
-            end_x > canvas_info['left'] + canvas_info['width'] or
-            end_y > canvas_info['top'] + canvas_info['height']):
-            logging.error(f"Circle coordinates exceed canvas boundaries: ({start_x},{start_y}) to ({end_x},{end_y})")
-            logging.error(f"Canvas boundaries: ({canvas_info['left']},{canvas_info['top']}) to "
-                          f"({canvas_info['left'] + canvas_info['width']},{canvas_info['top'] + canvas_info['height']})")
+        if (start_x < canvas_info.left or start_y < canvas_info.top or
+            end_x > canvas_info.left + canvas_info.width or
+            end_y > canvas_info.top + canvas_info.height):
+            logging.error("Circle coordinates exceed canvas boundaries: (%s,%s) to (%s,%s)", start_x, start_y, end_x, end_y)
+            logging.error("Canvas boundaries: (%s,%s) to (%s,%s)",
+                          canvas_info.left, canvas_info.top, canvas_info.right, canvas_info.bottom)
             return False
             
-        # Move to center of canvas first for better visual feedback
-        canvas_center_x = canvas_info['left'] + (canvas_info['width'] // 2)
-        canvas_center_y = canvas_info['top'] + (canvas_info['height'] // 2)
-        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.5)
-        time.sleep(0.5)
+        # Move to center of canvas first
+        canvas_center_x = canvas_info.left + (canvas_info.width // 2)
+        canvas_center_y = canvas_info.top + (canvas_info.height // 2)
+        _move(canvas_center_x, canvas_center_y)
         
         # Move to start position
-        logging.info(f"Moving to start position ({start_x}, {start_y})")
-        pyautogui.moveTo(start_x, start_y, duration=0.5)
-        time.sleep(0.5)
+        logging.info("Moving to start position (%s, %s)", start_x, start_y)
+        _move(start_x, start_y)
+        _settle()
         
         # Click and drag to end position
-        logging.info(f"Dragging to end position ({end_x}, {end_y})")
-        pyautogui.mouseDown()
-        time.sleep(0.3)
-        pyautogui.moveTo(end_x, end_y, duration=1.0)
-        time.sleep(0.3)
-        pyautogui.mouseUp()
-        time.sleep(1.0)
+        logging.info("Dragging to end position (%s, %s)", end_x, end_y)
+        _down()
+        _settle()
+        _move(end_x, end_y)
+        _settle()
+        _up()
+        _settle()
         
         # Move away from the drawn circle
-        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.5)
-        time.sleep(0.5)
+        _move(canvas_center_x, canvas_center_y)
+        _settle(200)
         
         # Screenshot after drawing
-        screenshot_after = pyautogui.screenshot()
+        after = _grab_gdi()
+        if session:
+            session.update(None, after)
         time.sleep(0.5)
         
         # Compare before and after to verify changes
-        # Focus on the circle boundary pixels
-        pixels_changed = False
-        for check_x in range(start_x, end_x, 10):
-            check_y_top = start_y
-            check_y_bottom = end_y
-            
-            # Check if pixels at the boundary changed
-            if (screenshot_before.getpixel((check_x, check_y_top)) != 
-                screenshot_after.getpixel((check_x, check_y_top)) or
-                screenshot_before.getpixel((check_x, check_y_bottom)) != 
-                screenshot_after.getpixel((check_x, check_y_bottom))):
-                pixels_changed = True
-                break
+        # Focus on the top and bottom boundary rows, sampling every 10px
+        boundary = np.s_[[start_y, end_y], start_x:end_x:10]
+        pixels_changed = bool(_changed_mask(before[boundary], after[boundary]).any())
                 
         if pixels_changed:
             logging.info("Successfully drew circle - pixel changes detected")
@@ -1016,14 +1393,14 @@ def draw_circle(x, y, radius):
             before_path = os.path.join(debug_dir, f"circle_before_{timestamp}.png")
             after_path = os.path.join(debug_dir, f"circle_after_{timestamp}.png")
             
-            screenshot_before.save(before_path)
-            screenshot_after.save(after_path)
-            logging.info(f"Saved debug screenshots to {before_path} and {after_path}")
+            _save_png(before, before_path)
+            _save_png(after, after_path)
+            logging.info("Saved debug screenshots to %s and %s", before_path, after_path)
             
             return False
             
     except Exception as e:
-        logging.error(f"Error drawing circle: {str(e)}", exc_info=True)
+        logging.error("Error drawing circle: %s", e, exc_info=True)
         return False
 
 def add_text_in_paint(text, x, y):
@@ -1039,14 +1416,14 @@ def add_text_in_paint(text, x, y):
             return False
             
         # Select text tool using keyboard navigation
-        pyautogui.press('esc')  # Clear any previous selection
-        time.sleep(0.2)
+        _clear_active_tool(0.2)  # Clear any previous selection
         pyautogui.hotkey('alt')
         time.sleep(0.2)
         pyautogui.press('h')  # Home tab
         time.sleep(0.2)
         pyautogui.press('a')  # Text tool
         time.sleep(0.5)
+        _paint_state['active_tool'] = 'text'
         
         # Get Paint canvas information
         canvas_info = get_paint_canvas_info()
@@ -1055,12 +1432,12 @@ def add_text_in_paint(text, x, y):
             return False
             
         # Validate and adjust coordinates to fit within canvas
-        x = max(0, min(x, canvas_info['width']))
-        y = max(0, min(y, canvas_info['height']))
+        x = max(0, min(x, canvas_info.width))
+        y = max(0, min(y, canvas_info.height))
         
         # Convert to screen coordinates
-        screen_x = canvas_info['left'] + x
-        screen_y = canvas_info['top'] + y
+        screen_x = canvas_info.left + x
+        screen_y = canvas_info.top + y
         
         print(f"Adding text at ({x}, {y})")
         print(f"Screen coordinates: ({screen_x}, {screen_y})")
@@ -1068,8 +1445,9 @@ def add_text_in_paint(text, x, y):
         # Click at position and type text
         pyautogui.click(screen_x, screen_y)
         time.sleep(0.5)
-        pyautogui.write(text)
-        time.sleep(0.5)
+        if text and not _send_inputs(_unicode_text_inputs(text)):
+            return False
+        time.sleep(0.05)
         
         # Click outside to finish text input
         pyautogui.click(screen_x + 100, screen_y + 100)
@@ -1089,13 +1467,13 @@ def save_image(path):
             
         # Convert path to Windows format and ensure it's absolute
         path = os.path.abspath(path).replace('/', '\\')
-        logging.info(f"Saving image with absolute path: {path}")
+        logging.info("Saving image with absolute path: %s", path)
         
         # Create directory if it doesn't exist
         directory = os.path.dirname(path)
         if not os.path.exists(directory):
             os.makedirs(directory)
-            logging.info(f"Created directory: {directory}")
+            logging.info("Created directory: %s", directory)
             
         # Press Ctrl+S for save dialog
         pyautogui.hotkey('ctrl', 's')
@@ -1133,22 +1511,27 @@ def save_image(path):
         except Exception:
             pass
             
-        # Verify file exists with retry
-        for attempt in range(5):
+        # Verify file exists with retry, polling from 50ms and doubling, and
+        # accept the file once its size is stable between two polls
+        delay = 0.05
+        for attempt in range(6):
             if os.path.exists(path):
                 file_size = os.path.getsize(path)
                 if file_size > 0:
-                    logging.info(f"File saved successfully at {path} (Size: {file_size} bytes)")
-                    return True
-            if attempt < 4:
-                logging.warning(f"File not found or empty, waiting... (attempt {attempt + 1}/5)")
-                time.sleep(2 ** attempt)  # Exponential backoff
+                    time.sleep(0.05)
+                    if os.path.getsize(path) == file_size:
+                        logging.info("File saved successfully at %s (Size: %s bytes)", path, file_size)
+                        return True
+            if attempt < 5:
+                logging.warning("File not found or still being written, waiting... (attempt %s/6)", attempt + 1)
+                time.sleep(delay)
+                delay *= 2
                 
-        logging.error(f"Failed to verify file at {path}")
+        logging.error("Failed to verify file at %s", path)
         return False
         
     except Exception as e:
-        logging.error(f"Error saving image: {str(e)}", exc_info=True)
+        logging.error("Error saving image: %s", e, exc_info=True)
         return False
 
 def draw_text(x, y, text):
@@ -1165,9 +1548,10 @@ def draw_text(x, y, text):
             return False
             
         # Validate coordinates are within canvas
-        canvas_left, canvas_top, canvas_right, canvas_bottom = canvas_info
+        canvas_left, canvas_top = canvas_info.left, canvas_info.top
+        canvas_right, canvas_bottom = canvas_info.right, canvas_info.bottom
         if not (canvas_left <= x <= canvas_right and canvas_top <= y <= canvas_bottom):
-            logging.error(f"Text coordinates ({x}, {y}) outside canvas bounds")
+            logging.error("Text coordinates (%s, %s) outside canvas bounds", x, y)
             return False
             
         # Select text tool - click at 20% from left, 75px from top
@@ -1175,14 +1559,15 @@ def draw_text(x, y, text):
         text_tool_x = int(window_width * 0.20)
         text_tool_y = 75
         
-        logging.info(f"Selecting text tool at ({text_tool_x}, {text_tool_y})")
+        logging.info("Selecting text tool at (%s, %s)", text_tool_x, text_tool_y)
         pyautogui.moveTo(text_tool_x, text_tool_y, duration=0.5)
         time.sleep(0.5)
         pyautogui.click()
         time.sleep(0.5)
+        _paint_state['active_tool'] = 'text'
         
         # Move to text position with visual feedback
-        logging.info(f"Moving to text position ({x}, {y})")
+        logging.info("Moving to text position (%s, %s)", x, y)
         pyautogui.moveTo(x, y, duration=0.5)
         time.sleep(0.5)
         
@@ -1190,10 +1575,12 @@ def draw_text(x, y, text):
         pyautogui.click()
         time.sleep(0.5)
         
-        # Type text slowly for reliability
-        logging.info(f"Typing text: {text}")
-        pyautogui.write(text, interval=0.1)
-        time.sleep(0.5)
+        # Type the whole string in one SendInput call
+        logging.info("Typing text: %s", text)
+        if text and not _send_inputs(_unicode_text_inputs(text)):
+            logging.error("Failed to type text")
+            return False
+        time.sleep(0.05)
         
         # Click away to finish text entry
         away_x = x + 50
@@ -1211,13 +1598,13 @@ def draw_text(x, y, text):
         return True
         
     except Exception as e:
-        logging.error(f"Error in draw_text: {str(e)}")
+        logging.error("Error in draw_text: %s", e)
         return False
 
 def draw_direct_rectangle(x1, y1, x2, y2):
     """Simple direct approach to draw a rectangle in Paint"""
     try:
-        logging.info(f"Drawing rectangle directly from ({x1}, {y1}) to ({x2}, {y2})")
+        logging.info("Drawing rectangle directly from (%s, %s) to (%s, %s)", x1, y1, x2, y2)
         
         # Ensure Paint is focused and maximized
         if not ensure_paint_focused():
@@ -1230,54 +1617,27 @@ def draw_direct_rectangle(x1, y1, x2, y2):
             logging.error("Failed to find Paint window")
             return False
         
-        # Take screenshot before actions to detect changes
-        screenshot_before = pyautogui.screenshot()
-        
         # Get window dimensions with direct Win32 call for more accuracy
-        window_rect = win32gui.GetWindowRect(paint_window)
+        window_rect = _get_window_rect(paint_window)
         win_x, win_y, win_right, win_bottom = window_rect
         window_width = win_right - win_x
         window_height = win_bottom - win_y
-        logging.info(f"Paint window dimensions: {window_width}x{window_height} at ({win_x},{win_y})")
-        
-        # Press Escape to clear any current tool or selection
-        pyautogui.press('esc')
-        time.sleep(1)
-        
-        # Try a more reliable method to select the rectangle tool
-        # First try using keyboard shortcut for shapes (Alt+H, SH)
-        logging.info("Using keyboard shortcuts to select shape tools")
-        pyautogui.hotkey('alt', 'h')
-        time.sleep(1)
-        pyautogui.press('s')
-        time.sleep(1)
-        pyautogui.press('h')
-        time.sleep(1)
-        
-        # Now select rectangle (first option in shapes)
-        logging.info("Selecting rectangle shape")
-        pyautogui.press('r')  # First letter of rectangle
-        time.sleep(1)
-        
-        # Alternative: Try clicking directly on specific toolbar positions
-        # These coordinates are for the rectangle tool in the Home tab
-        shape_x = win_x + int(window_width * 0.33)  # 33% from left
-        shape_y = win_y + 75                       # 75px from top
-        
-        logging.info(f"Clicking directly on shapes tool at ({shape_x}, {shape_y})")
-        pyautogui.moveTo(shape_x, shape_y, duration=1.0)
-        time.sleep(1)
-        pyautogui.click()
-        time.sleep(2)
-        
-        # Then click on Rectangle (first shape in menu)
-        rect_x = shape_x
-        rect_y = shape_y + 40
-        logging.info(f"Clicking rectangle shape at ({rect_x}, {rect_y})")
-        pyautogui.moveTo(rect_x, rect_y, duration=1.0)
-        time.sleep(1)
-        pyautogui.click()
-        time.sleep(2)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Paint window dimensions: %sx%s at (%s,%s)", window_width, window_height, win_x, win_y)
+        
+        # Press Escape to commit the previous shape or clear any selection
+        _commit_shape()
+        
+        # Consecutive rectangles reuse the tool that is already selected
+        if _paint_state['active_tool'] != 'rectangle':
+            # Select shapes then rectangle via ribbon keytips (Alt+H, S, H, R) in one batch
+            logging.info("Using keyboard shortcuts to select the rectangle shape")
+            if not _send_inputs(_alt_combo_inputs(ord('H')) +
+                                _key_press_inputs(ord('S'), ord('H'), ord('R'))):
+                logging.error("Failed to send rectangle tool shortcut")
+                return False
+            time.sleep(0.15)
+            _paint_state['active_tool'] = 'rectangle'
         
         # Get canvas info for drawing area
         canvas_info = get_paint_canvas_info()
@@ -1286,87 +1646,88 @@ def draw_direct_rectangle(x1, y1, x2, y2):
             return False
         
         # Log canvas info in greater detail
-        logging.info(f"Canvas details: Left={canvas_info['left']}, Top={canvas_info['top']}, "
-                     f"Right={canvas_info['right']}, Bottom={canvas_info['bottom']}, "
-                     f"Width={canvas_info['width']}, Height={canvas_info['height']}")
+        logging.info("Canvas details: Left=%s, Top=%s, Right=%s, Bottom=%s, Width=%s, Height=%s",
+                     canvas_info.left, canvas_info.top, canvas_info.right,
+                     canvas_info.bottom, canvas_info.width, canvas_info.height)
         
         # Convert coordinates to screen coordinates
         if x1 < 1000 and y1 < 1000:  # Likely canvas-relative
-            screen_x1 = canvas_info['left'] + x1
-            screen_y1 = canvas_info['top'] + y1
-            screen_x2 = canvas_info['left'] + x2
-            screen_y2 = canvas_info['top'] + y2
-            logging.info(f"Converting canvas coordinates: ({x1},{y1}) -> ({screen_x1},{screen_y1}), ({x2},{y2}) -> ({screen_x2},{screen_y2})")
+            screen_x1 = canvas_info.left + x1
+            screen_y1 = canvas_info.top + y1
+            screen_x2 = canvas_info.left + x2
+            screen_y2 = canvas_info.top + y2
+            logging.info("Converting canvas coordinates: (%s,%s) -> (%s,%s), (%s,%s) -> (%s,%s)", x1, y1, screen_x1, screen_y1, x2, y2, screen_x2, screen_y2)
         else:
             screen_x1 = x1
             screen_y1 = y1
             screen_x2 = x2
             screen_y2 = y2
-            logging.info(f"Using as screen coordinates: ({screen_x1},{screen_y1}) to ({screen_x2},{screen_y2})")
+            logging.info("Using as screen coordinates: (%s,%s) to (%s,%s)", screen_x1, screen_y1, screen_x2, screen_y2)
             
         # Validate drawing coordinates are within canvas
-        if not (canvas_info['left'] <= screen_x1 <= canvas_info['right'] and
-                canvas_info['top'] <= screen_y1 <= canvas_info['bottom'] and
-                canvas_info['left'] <= screen_x2 <= canvas_info['right'] and
-                canvas_info['top'] <= screen_y2 <= canvas_info['bottom']):
+        if not (canvas_info.left <= screen_x1 <= canvas_info.right and
+                canvas_info.top <= screen_y1 <= canvas_info.bottom and
+                canvas_info.left <= screen_x2 <= canvas_info.right and
+                canvas_info.top <= screen_y2 <= canvas_info.bottom):
             logging.warning("Drawing coordinates are outside canvas boundaries, adjusting...")
-            screen_x1 = max(canvas_info['left'] + 10, min(screen_x1, canvas_info['right'] - 10))
-            screen_y1 = max(canvas_info['top'] + 10, min(screen_y1, canvas_info['bottom'] - 10))
-            screen_x2 = max(canvas_info['left'] + 10, min(screen_x2, canvas_info['right'] - 10))
-            screen_y2 = max(canvas_info['top'] + 10, min(screen_y2, canvas_info['bottom'] - 10))
-            logging.info(f"Adjusted to: ({screen_x1},{screen_y1}) to ({screen_x2},{screen_y2})")
+            screen_x1, screen_y1, screen_x2, screen_y2 = np.clip(
+                [screen_x1, screen_y1, screen_x2, screen_y2],
+                [canvas_info.left + 10, canvas_info.top + 10] * 2,
+                [canvas_info.right - 10, canvas_info.bottom - 10] * 2
+            ).tolist()
+            logging.info("Adjusted to: (%s,%s) to (%s,%s)", screen_x1, screen_y1, screen_x2, screen_y2)
         
-        # Move to center of canvas first to ensure tool selection
-        canvas_center_x = (canvas_info['left'] + canvas_info['right']) // 2
-        canvas_center_y = (canvas_info['top'] + canvas_info['bottom']) // 2
-        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.5)
-        time.sleep(1)
+        # Take screenshot of the drawing area before drawing to detect changes
+        roi = _roi_region(screen_x1, screen_y1, screen_x2, screen_y2)
+        before = _grab_gdi(roi)
         
-        # Draw the rectangle with exaggerated movements for visibility
-        logging.info(f"Moving to start position ({screen_x1}, {screen_y1}) - VISIBLE FEEDBACK")
-        for i in range(5):  # Add a small circular motion for visibility
-            offset = 3
-            pyautogui.moveTo(screen_x1 + offset, screen_y1, duration=0.1)
-            pyautogui.moveTo(screen_x1, screen_y1 + offset, duration=0.1)
-            pyautogui.moveTo(screen_x1 - offset, screen_y1, duration=0.1)
-            pyautogui.moveTo(screen_x1, screen_y1 - offset, duration=0.1)
+        # Move to center of canvas first to ensure tool selection
+        canvas_center_x = (canvas_info.left + canvas_info.right) // 2
+        canvas_center_y = (canvas_info.top + canvas_info.bottom) // 2
+        _move(canvas_center_x, canvas_center_y)
         
-        pyautogui.moveTo(screen_x1, screen_y1, duration=1.0)
-        time.sleep(1)
+        logging.info("Moving to start position (%s, %s)", screen_x1, screen_y1)
+        _move(screen_x1, screen_y1)
+        _settle()
         
-        # Press and hold with visible feedback
+        # Press and hold
         logging.info("PRESSING MOUSE DOWN")
-        pyautogui.mouseDown(button='left')
-        time.sleep(1)
+        _down()
+        _settle()
         
-        # Move to end position very slowly for better control
-        logging.info(f"DRAGGING to end position ({screen_x2}, {screen_y2})")
-        pyautogui.moveTo(screen_x2, screen_y1, duration=1.0)  # First go horizontally
-        time.sleep(0.5)
-        pyautogui.moveTo(screen_x2, screen_y2, duration=1.0)  # Then vertically
-        time.sleep(1)
+        # Move to end position
+        logging.info("DRAGGING to end position (%s, %s)", screen_x2, screen_y2)
+        _move(screen_x2, screen_y2)
+        _settle(20)
         
         # Release mouse button
         logging.info("RELEASING MOUSE BUTTON")
-        pyautogui.mouseUp(button='left')
-        time.sleep(1)
+        _up()
+        _settle(200)
         
         # Take screenshot after to verify drawing
-        screenshot_after = pyautogui.screenshot()
-        
-        # Compare screenshots to see if something changed
-        pixels_changed = 0
-        sample_points = []
-        for x in range(min(screen_x1, screen_x2), max(screen_x1, screen_x2), 10):
-            for y in range(min(screen_y1, screen_y2), max(screen_y1, screen_y2), 10):
-                if screenshot_before.getpixel((x, y)) != screenshot_after.getpixel((x, y)):
-                    pixels_changed += 1
-                    if len(sample_points) < 5:
-                        sample_points.append((x, y))
-        
-        logging.info(f"Detected {pixels_changed} changed pixels in drawing area")
-        for point in sample_points:
-            logging.info(f"Pixel changed at {point}: {screenshot_before.getpixel(point)} -> {screenshot_after.getpixel(point)}")
+        after = _grab_gdi(roi)
+        
+        # Identical captures mean nothing was drawn, so skip the per-pixel diff
+        if np.array_equal(before, after):
+            logging.error("No pixel changes detected, rectangle might not have been drawn")
+            return False
+        
+        # Compare screenshots to see if something changed, sampling a 10px grid
+        origin_x, origin_y = (roi['left'], roi['top']) if roi else (_monitor['left'], _monitor['top'])
+        x_lo = min(screen_x1, screen_x2)
+        y_lo = min(screen_y1, screen_y2)
+        grid = np.s_[y_lo - origin_y:max(screen_y1, screen_y2) - origin_y:10,
+                     x_lo - origin_x:max(screen_x1, screen_x2) - origin_x:10]
+        before_roi = before[grid]
+        after_roi = after[grid]
+        changed = _changed_mask(before_roi, after_roi)
+        pixels_changed = int(changed.sum())
+        
+        logging.info("Detected %s changed pixels in drawing area", pixels_changed)
+        for row, col in np.argwhere(changed)[:5]:
+            logging.info("Pixel changed at %s: %s -> %s", (x_lo + col * 10, y_lo + row * 10),
+                         tuple(before_roi[row, col]), tuple(after_roi[row, col]))
         
         if pixels_changed > 10:
             logging.info("Rectangle appears to be successfully drawn (detected changes)")
@@ -1376,13 +1737,35 @@ def draw_direct_rectangle(x1, y1, x2, y2):
             return False
         
     except Exception as e:
-        logging.error(f"Error drawing rectangle: {str(e)}", exc_info=True)
+        logging.error("Error drawing rectangle: %s", e, exc_info=True)
         return False
 
+def _terminate_paint_process(hwnd):
+    """
+    Terminate the process owning the given Paint window, falling back to
+    taskkill if the process cannot be opened.
+    """
+    try:
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        handle = win32api.OpenProcess(win32con.PROCESS_TERMINATE, False, pid)
+        try:
+            win32api.TerminateProcess(handle, 0)
+        finally:
+            win32api.CloseHandle(handle)
+        logging.info("Terminated Paint process %s", pid)
+    except Exception as e:
+        logging.warning("Could not terminate Paint process directly (%s), using taskkill", e)
+        os.system("taskkill /f /im mspaint.exe")
+
 def close_paint():
     """Closes all instances of Microsoft Paint, handling save dialogs."""
     try:
         logging.info("Attempting to close Paint...")
+        _reset_paint_state()
+        _release_dib()
+        _invalidate_enum_cache()
+        _invalidate_window_rect()
+        _menu_commands.clear()
         # Try to find Paint window
         paint_window = find_paint_window()
         if paint_window:
@@ -1401,7 +1784,7 @@ def close_paint():
                         title = win32gui.GetWindowText(hwnd)
                         # Check for Paint or "Save" in the title
                         if "Paint" in title and ("save" in title.lower() or "?" in title):
-                            logging.info(f"Found potential save dialog: '{title}'")
+                            logging.info("Found potential save dialog: '%s'", title)
                             dialog_found[0] = True
                             dialog_hwnd[0] = hwnd
                             
@@ -1433,29 +1816,31 @@ def close_paint():
                         dont_save_x = d_left + (dialog_width // 2)
                         dont_save_y = d_bottom - 20  # 20px from bottom
                         
-                        logging.info(f"Clicking 'Don't Save' button at ({dont_save_x}, {dont_save_y})")
+                        logging.info("Clicking 'Don't Save' button at (%s, %s)", dont_save_x, dont_save_y)
                         pyautogui.moveTo(dont_save_x, dont_save_y, duration=0.5)
                         pyautogui.click()
                         time.sleep(1)
                     except Exception as e:
-                        logging.error(f"Error handling save dialog: {str(e)}")
+                        logging.error("Error handling save dialog: %s", e)
                         # Fall back to Alt+N for "Don't Save"
                         pyautogui.hotkey('alt', 'n')
                         time.sleep(1)
             
             # Check if Paint is still open
             time.sleep(1)
-            if find_paint_window():
+            paint_window = find_paint_window()
+            if paint_window:
                 logging.warning("Paint didn't close gracefully, trying to kill process")
-                os.system("taskkill /f /im mspaint.exe")
+                _terminate_paint_process(paint_window)
                 
         else:
-            # Try to kill all Paint processes
-            logging.info("No Paint window found, trying to kill any Paint processes")
-            os.system("taskkill /f /im mspaint.exe")
+            # Nothing to close, so don't spawn taskkill just to find no process
+            logging.info("No Paint window found, nothing to close")
+            return True
             
         # Verify Paint is closed
         time.sleep(1.5)
+        _invalidate_enum_cache()
         if not find_paint_window():
             logging.info("Paint closed successfully")
             return True
@@ -1464,5 +1849,5 @@ def close_paint():
             return False
             
     except Exception as e:
-        logging.error(f"Error closing Paint: {str(e)}")
+        logging.error("Error closing Paint: %s", e)
         return False 
\ No newline at end of file
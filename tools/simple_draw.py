@@ -7,19 +7,66 @@ with robust error handling and visual feedback.
 import os
 import sys
 import time
+import math
+import ctypes
+from ctypes import wintypes
 import logging
-import subprocess
 import pyautogui
+import numpy as np
 import win32gui
 import win32con
 import win32api
+import win32clipboard
+import win32event
+import win32process
+from PIL import ImageGrab
 from datetime import datetime
 import traceback
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 # Configure PyAutoGUI
 pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.2
+pyautogui.PAUSE = 0  # Explicit time.sleep() calls gate on UI state instead
+
+# Last Paint window handle found by find_paint_window()
+_paint_hwnd_cache = None
+
+# get_paint_canvas_bounds() results keyed on the Paint window rectangle
+_canvas_cache = {}
+
+# Tool selected by the last draw call, and how long the last focus is trusted
+_current_tool = None
+_focus_ok_until = 0
+FOCUS_TTL = 2.0  # seconds
+
+# Unit-circle offsets (cos, sin) of the points checked when verifying a circle
+_CIRCLE_SAMPLE_ANGLES = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in range(0, 360, 30)]
+_CIRCLE_SAMPLE_RADII = (0.85, 0.9, 0.95)  # Fractions of the radius, just inside the outline
+
+# Win32 SendInput structures for the drag gesture
+INPUT_MOUSE = 0
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_ABSOLUTE = 0x8000
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", wintypes.LONG),
+                ("dy", wintypes.LONG),
+                ("mouseData", wintypes.DWORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ctypes.c_size_t)]
+
+class _INPUTUNION(ctypes.Union):
+    # Sized for the largest member (KEYBDINPUT/HARDWAREINPUT are smaller)
+    _fields_ = [("mi", MOUSEINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD),
+                ("union", _INPUTUNION)]
 
 def setup_logging():
     """Set up logging for the simple drawing module"""
@@ -39,41 +86,174 @@ def setup_logging():
     )
     return log_file
 
+def _set_paint_hwnd(hwnd):
+    """Replace the cached Paint handle, forgetting the selected tool when the window changes"""
+    global _paint_hwnd_cache, _current_tool
+    if hwnd != _paint_hwnd_cache:
+        _current_tool = None
+    _paint_hwnd_cache = hwnd
+
 def find_paint_window():
     """Find the MS Paint window with multiple methods and robust error handling"""
     try:
+        # Reuse the last handle while it still refers to a visible window
+        if (_paint_hwnd_cache and win32gui.IsWindow(_paint_hwnd_cache) and
+                win32gui.IsWindowVisible(_paint_hwnd_cache)):
+            return _paint_hwnd_cache
+        _set_paint_hwnd(None)
+        
         # Try several window titles that Paint might have
         possible_titles = ["Untitled - Paint", "Paint", "*.png - Paint", "*.bmp - Paint"]
         
         for title in possible_titles:
             hwnd = win32gui.FindWindow(None, title)
             if hwnd and win32gui.IsWindowVisible(hwnd):
-                logging.info(f"Found Paint window with title '{title}', hwnd: {hwnd}")
+                logger.info("Found Paint window with title '%s', hwnd: %s", title, hwnd)
+                _set_paint_hwnd(hwnd)
                 return hwnd
         
-        # If not found by exact title, try searching for windows containing "Paint"
-        def enum_callback(hwnd, results):
+        # If not found by exact title, walk the top-level windows, preferring
+        # classic Paint's locale-independent class name over a title match
+        title_match = None
+        hwnd = win32gui.FindWindowEx(0, 0, None, None)
+        while hwnd:
             if win32gui.IsWindowVisible(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                if "Paint" in title:
-                    results.append((hwnd, title))
-        
-        paint_windows = []
-        win32gui.EnumWindows(enum_callback, paint_windows)
-        
-        if paint_windows:
-            hwnd, title = paint_windows[0]
-            logging.info(f"Found Paint window with partial title match: '{title}', hwnd: {hwnd}")
-            return hwnd
+                if win32gui.GetClassName(hwnd) == "MSPaintApp":
+                    logger.info("Found Paint window by class name, hwnd: %s", hwnd)
+                    _set_paint_hwnd(hwnd)
+                    return hwnd
+                if title_match is None and "Paint" in win32gui.GetWindowText(hwnd):
+                    title_match = hwnd
+            hwnd = win32gui.FindWindowEx(0, hwnd, None, None)
+        
+        if title_match:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Found Paint window with partial title match: '%s', hwnd: %s",
+                            win32gui.GetWindowText(title_match), title_match)
+            _set_paint_hwnd(title_match)
+            return title_match
             
-        logging.error("Could not find Paint window")
+        logger.error("Could not find Paint window")
         return None
         
     except Exception as e:
-        logging.error(f"Error finding Paint window: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error finding Paint window: %s", e)
+        logger.error(traceback.format_exc())
         return None
 
+def _wait_until(cond, timeout=2.0, poll=0.025):
+    """Poll cond() until it is truthy or the timeout expires; returns True if it became truthy, else False"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(poll)
+    return False
+
+def _fast_key_sequence(keys, gap=0.08):
+    """Tap each key ('alt' or a single character) in order with a short gap between them"""
+    for key in keys:
+        vk = win32con.VK_MENU if key == 'alt' else ord(key.upper())
+        win32api.keybd_event(vk, 0, 0, 0)
+        win32api.keybd_event(vk, 0, win32con.KEYEVENTF_KEYUP, 0)
+        time.sleep(gap)
+
+def _send_drag(x1, y1, x2, y2):
+    """Press at (x1, y1), drag to (x2, y2) and release in a single SendInput call"""
+    screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
+    screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
+    
+    def mouse(flags, x=0, y=0):
+        if flags & MOUSEEVENTF_ABSOLUTE:
+            x = (x * 65535) // (screen_width - 1)
+            y = (y * 65535) // (screen_height - 1)
+        return INPUT(type=INPUT_MOUSE, union=_INPUTUNION(mi=MOUSEINPUT(dx=x, dy=y, dwFlags=flags)))
+    
+    events = (INPUT * 4)(
+        mouse(MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE, x1, y1),
+        mouse(MOUSEEVENTF_LEFTDOWN),
+        mouse(MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE, x2, y2),
+        mouse(MOUSEEVENTF_LEFTUP),
+    )
+    sent = ctypes.windll.user32.SendInput(len(events), events, ctypes.sizeof(INPUT))
+    if sent != len(events):
+        logger.error("SendInput delivered %s of %s drag events", sent, len(events))
+        return False
+    return True
+
+# Clipboard formats whose data is a handle rather than bytes, so it can't be put back as-is.
+# CF_BITMAP/CF_PALETTE are skipped instead: Windows also offers them as CF_DIB, which is kept.
+_CLIPBOARD_HANDLE_FORMATS = {win32con.CF_METAFILEPICT, win32con.CF_ENHMETAFILE, win32con.CF_OWNERDISPLAY,
+                             win32con.CF_DSPBITMAP, win32con.CF_DSPMETAFILEPICT, win32con.CF_DSPENHMETAFILE}
+_CLIPBOARD_SYNTHESIZED_FORMATS = {win32con.CF_BITMAP, win32con.CF_PALETTE}
+
+def _snapshot_clipboard():
+    """
+    Copy every format on the open clipboard into {format: data}, or return
+    None when some format can't be restored byte-for-byte (e.g. a file list).
+    """
+    snapshot = {}
+    fmt = win32clipboard.EnumClipboardFormats(0)
+    while fmt:
+        if fmt not in _CLIPBOARD_SYNTHESIZED_FORMATS:
+            # Private (0x200-0x2FF) and GDI object (0x300-0x3FF) formats are handles too
+            if fmt in _CLIPBOARD_HANDLE_FORMATS or 0x200 <= fmt <= 0x3FF:
+                return None
+            try:
+                data = win32clipboard.GetClipboardData(fmt)
+            except Exception:
+                return None
+            if not isinstance(data, (bytes, str)):
+                return None
+            snapshot[fmt] = data
+        fmt = win32clipboard.EnumClipboardFormats(fmt)
+    return snapshot
+
+def _focused_control_text():
+    """Text of the control that has keyboard focus in the foreground window"""
+    try:
+        thread_id = win32process.GetWindowThreadProcessId(win32gui.GetForegroundWindow())[0]
+        focus = win32gui.GetGUIThreadInfo(thread_id)[2]
+    except win32gui.error:
+        return ""
+    if not focus:
+        return ""
+    # WM_GETTEXT is marshalled across processes, unlike GetWindowText for controls
+    length = win32gui.SendMessage(focus, win32con.WM_GETTEXTLENGTH, 0, 0)
+    buffer = ctypes.create_unicode_buffer(length + 1)
+    ctypes.windll.user32.SendMessageW(focus, win32con.WM_GETTEXT, length + 1, buffer)
+    return buffer.value
+
+def _paste_text(text):
+    """Paste text into the focused control via the clipboard, restoring its previous contents"""
+    win32clipboard.OpenClipboard()
+    try:
+        previous = _snapshot_clipboard()
+        if previous is not None:
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardText(text, win32con.CF_UNICODETEXT)
+    finally:
+        win32clipboard.CloseClipboard()
+        
+    if previous is None:
+        # Emptying the clipboard would destroy data we can't put back, so type instead
+        logger.info("Clipboard holds data that can't be restored, typing text instead")
+        pyautogui.write(text)
+        return
+        
+    try:
+        pyautogui.hotkey('ctrl', 'v')
+        # Restore only once the control has read the clipboard, bounded for controls we can't read
+        _wait_until(lambda: text in _focused_control_text(), timeout=1.0)
+    finally:
+        win32clipboard.OpenClipboard()
+        try:
+            win32clipboard.EmptyClipboard()
+            for fmt, data in previous.items():
+                win32clipboard.SetClipboardData(fmt, data)
+        finally:
+            win32clipboard.CloseClipboard()
+
 def maximize_window(hwnd):
     """Maximize the given window"""
     try:
@@ -81,41 +261,46 @@ def maximize_window(hwnd):
             # Get current window state
             placement = win32gui.GetWindowPlacement(hwnd)
             if placement[1] != win32con.SW_SHOWMAXIMIZED:
-                logging.info(f"Maximizing window {hwnd}")
+                logger.info("Maximizing window %s", hwnd)
                 win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
                 time.sleep(0.5)
                 return True
             else:
-                logging.info(f"Window {hwnd} is already maximized")
+                logger.info("Window %s is already maximized", hwnd)
                 return True
         return False
     except Exception as e:
-        logging.error(f"Error maximizing window: {str(e)}")
+        logger.error("Error maximizing window: %s", e)
         return False
 
 def focus_paint_window():
     """Ensure the Paint window is in focus and maximized"""
+    global _focus_ok_until
     try:
         hwnd = find_paint_window()
         if not hwnd:
-            logging.error("No Paint window found to focus")
+            logger.error("No Paint window found to focus")
             return False
             
         # Log current window state
-        current_active = win32gui.GetForegroundWindow()
-        current_title = win32gui.GetWindowText(current_active)
-        logging.info(f"Current active window: '{current_title}' (hwnd: {current_active})")
+        if logger.isEnabledFor(logging.INFO):
+            current_active = win32gui.GetForegroundWindow()
+            current_title = win32gui.GetWindowText(current_active)
+            logger.info("Current active window: '%s' (hwnd: %s)", current_title, current_active)
         
         # First, restore if minimized
         if win32gui.IsIconic(hwnd):
-            logging.info("Restoring minimized Paint window")
+            logger.info("Restoring minimized Paint window")
+            _canvas_cache.clear()
             win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
             time.sleep(0.5)
             
         # Try to set as foreground window
-        logging.info(f"Setting Paint window (hwnd: {hwnd}) as foreground")
+        if win32gui.GetForegroundWindow() != hwnd:
+            _canvas_cache.clear()
+        logger.info("Setting Paint window (hwnd: %s) as foreground", hwnd)
         win32gui.SetForegroundWindow(hwnd)
-        time.sleep(0.5)
+        _wait_until(lambda: win32gui.GetForegroundWindow() == hwnd, timeout=0.5)
         
         # Maximize the window
         maximize_window(hwnd)
@@ -123,13 +308,14 @@ def focus_paint_window():
         # Verify focus was achieved
         new_active = win32gui.GetForegroundWindow()
         if new_active == hwnd:
-            logging.info("Successfully focused Paint window")
+            logger.info("Successfully focused Paint window")
             # Press Escape to clear any dialogs or tool selections
             pyautogui.press('esc')
             time.sleep(0.5)
+            _focus_ok_until = time.monotonic() + FOCUS_TTL
             return True
         else:
-            logging.warning(f"Failed to focus Paint window. Current active: {new_active}")
+            logger.warning("Failed to focus Paint window. Current active: %s", new_active)
             
             # Try alternative method - click on the window title bar
             try:
@@ -137,7 +323,7 @@ def focus_paint_window():
                 title_x = (rect[0] + rect[2]) // 2  # Middle of window
                 title_y = rect[1] + 15  # Near top of window
                 
-                logging.info(f"Clicking on Paint window title bar at ({title_x}, {title_y})")
+                logger.info("Clicking on Paint window title bar at (%s, %s)", title_x, title_y)
                 pyautogui.moveTo(title_x, title_y, duration=0.5)
                 time.sleep(0.5)
                 pyautogui.click()
@@ -145,15 +331,16 @@ def focus_paint_window():
                 
                 # Check if focus was achieved
                 if win32gui.GetForegroundWindow() == hwnd:
-                    logging.info("Successfully focused Paint window by clicking title bar")
+                    logger.info("Successfully focused Paint window by clicking title bar")
+                    _focus_ok_until = time.monotonic() + FOCUS_TTL
                     return True
             except Exception as e:
-                logging.error(f"Error clicking on title bar: {str(e)}")
+                logger.error("Error clicking on title bar: %s", e)
                 
             return False
     except Exception as e:
-        logging.error(f"Error focusing Paint window: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error focusing Paint window: %s", e)
+        logger.error(traceback.format_exc())
         return False
 
 def open_paint_simple():
@@ -162,30 +349,38 @@ def open_paint_simple():
         # First check if Paint is already running
         paint_hwnd = find_paint_window()
         if paint_hwnd:
-            logging.info("Paint is already running")
+            logger.info("Paint is already running")
             if focus_paint_window():
                 return True
         
-        # Try to open Paint using mspaint command
-        logging.info("Launching MS Paint...")
-        subprocess.Popen(["mspaint"])
-        
-        # Wait for Paint to open
-        for i in range(10):
-            time.sleep(1)
+        # Launch Paint and wait until its message loop is ready for input;
+        # a new window starts with Paint's default tool
+        logger.info("Launching MS Paint...")
+        _set_paint_hwnd(None)
+        process_handle, thread_handle, _, _ = win32process.CreateProcess(
+            None, "mspaint.exe", None, None, False, 0, None, None, win32process.STARTUPINFO())
+        try:
+            win32event.WaitForInputIdle(process_handle, 5000)
+        finally:
+            process_handle.Close()
+            thread_handle.Close()
+        
+        # Poll for the window, which may appear slightly after input idle
+        start = time.monotonic()
+        while time.monotonic() - start < 10:
             paint_hwnd = find_paint_window()
             if paint_hwnd:
-                logging.info(f"Paint window found after {i+1} seconds")
-                time.sleep(1)  # Additional wait for initialization
+                logger.info("Paint window found after %.1f seconds", time.monotonic() - start)
                 if focus_paint_window():
                     return True
+            time.sleep(0.1)
         
-        logging.error("Failed to open Paint after 10 seconds")
+        logger.error("Failed to open Paint after 10 seconds")
         return False
         
     except Exception as e:
-        logging.error(f"Error opening Paint: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error opening Paint: %s", e)
+        logger.error(traceback.format_exc())
         return False
 
 def get_paint_canvas_bounds():
@@ -194,16 +389,19 @@ def get_paint_canvas_bounds():
         # Find Paint window
         paint_hwnd = find_paint_window()
         if not paint_hwnd:
-            logging.error("Cannot find Paint window to get canvas bounds")
+            logger.error("Cannot find Paint window to get canvas bounds")
             return None
             
-        # Get window dimensions
+        # Get window dimensions; the canvas only moves with the window
         window_rect = win32gui.GetWindowRect(paint_hwnd)
+        cached = _canvas_cache.get(window_rect)
+        if cached:
+            return cached
         win_x, win_y, win_right, win_bottom = window_rect
         win_width = win_right - win_x
         win_height = win_bottom - win_y
         
-        logging.info(f"Paint window dimensions: {win_width}x{win_height} at ({win_x}, {win_y})")
+        logger.info("Paint window dimensions: %sx%s at (%s, %s)", win_width, win_height, win_x, win_y)
         
         # Calculate canvas boundaries - adjusted based on screenshot
         # Looking at your provided screenshots, the canvas area is clearly visible 
@@ -230,27 +428,71 @@ def get_paint_canvas_bounds():
             "center_y": (canvas_top + canvas_bottom) // 2
         }
         
-        logging.info(f"Canvas dimensions: {canvas_info['width']}x{canvas_info['height']}")
-        logging.info(f"Canvas bounds: ({canvas_left}, {canvas_top}) to ({canvas_right}, {canvas_bottom})")
+        logger.info("Canvas dimensions: %sx%s", canvas_info['width'], canvas_info['height'])
+        logger.info("Canvas bounds: (%s, %s) to (%s, %s)", canvas_left, canvas_top, canvas_right, canvas_bottom)
         
+        _canvas_cache[window_rect] = canvas_info
         return canvas_info
         
     except Exception as e:
-        logging.error(f"Error getting canvas bounds: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error getting canvas bounds: %s", e)
+        logger.error(traceback.format_exc())
         return None
 
+def _ensure_focus():
+    """Focus Paint unless it was focused within the last FOCUS_TTL seconds"""
+    return time.monotonic() < _focus_ok_until or focus_paint_window()
+
+def _select_rectangle_with_shortcuts():
+    """
+    Select the rectangle tool via ribbon keytips. The shortcut works on all
+    supported Paint versions, so the slower mouse method in
+    select_rectangle_tool() is not repeated afterwards.
+    """
+    logger.info("Using keyboard shortcuts for rectangle...")
+    pyautogui.press('esc')  # Clear any active tool
+    time.sleep(0.5)
+    
+    # Use Alt+H, S, R sequence for rectangle
+    _fast_key_sequence(['alt', 'h', 's', 'r'])
+    time.sleep(0.3)
+    return True
+
+def _ensure_ready(tool):
+    """
+    Focus Paint and select 'rect' or 'oval', skipping the selection while the
+    focus is recent and the tool is already current.
+    """
+    global _current_tool
+    focus_recent = time.monotonic() < _focus_ok_until
+    if not _ensure_focus():
+        logger.error("Failed to focus Paint window")
+        return False
+    if focus_recent and _current_tool == tool:
+        # Only the keytip walk is skipped; Esc still commits the previous shape
+        # so the next drag can't move or resize it
+        pyautogui.press('esc')
+        time.sleep(0.05)
+        return True
+        
+    selector = _select_rectangle_with_shortcuts if tool == 'rect' else select_oval_tool
+    if not selector():
+        _current_tool = None
+        return False
+    _current_tool = tool
+    return True
+
 def select_rectangle_tool():
     """Select the rectangle tool in Paint using EXACT coordinates from screenshot"""
     try:
-        if not focus_paint_window():
-            logging.error("Could not focus Paint window")
+        if not _ensure_focus():
+            logger.error("Could not focus Paint window")
             return False
             
         # Get Paint window dimensions
         paint_hwnd = find_paint_window()
         if not paint_hwnd:
-            logging.error("Could not find Paint window")
+            logger.error("Could not find Paint window")
             return False
             
         window_rect = win32gui.GetWindowRect(paint_hwnd)
@@ -270,8 +512,8 @@ def select_rectangle_tool():
         shapes_button_x = win_x + int(win_width * 0.40)
         shapes_button_y = win_y + 65  # Based on screenshot
         
-        logging.info(f"Clicking Shapes button at ({shapes_button_x}, {shapes_button_y})")
-        pyautogui.moveTo(shapes_button_x, shapes_button_y, duration=0.5)
+        logger.info("Clicking Shapes button at (%s, %s)", shapes_button_x, shapes_button_y)
+        pyautogui.moveTo(shapes_button_x, shapes_button_y, duration=0)
         time.sleep(0.3)
         pyautogui.click()
         time.sleep(1.0)  # Wait for shapes menu to appear
@@ -281,8 +523,8 @@ def select_rectangle_tool():
         rect_shape_x = shapes_button_x - 30  # Slightly to the left
         rect_shape_y = shapes_button_y + 50  # Down into the menu
         
-        logging.info(f"Clicking Rectangle shape at ({rect_shape_x}, {rect_shape_y})")
-        pyautogui.moveTo(rect_shape_x, rect_shape_y, duration=0.5)
+        logger.info("Clicking Rectangle shape at (%s, %s)", rect_shape_x, rect_shape_y)
+        pyautogui.moveTo(rect_shape_x, rect_shape_y, duration=0)
         time.sleep(0.3)
         pyautogui.click()
         time.sleep(1.0)
@@ -290,22 +532,22 @@ def select_rectangle_tool():
         # Move mouse to neutral area
         canvas_info = get_paint_canvas_bounds()
         if canvas_info:
-            pyautogui.moveTo(canvas_info["center_x"], canvas_info["center_y"], duration=0.3)
+            pyautogui.moveTo(canvas_info["center_x"], canvas_info["center_y"], duration=0)
             time.sleep(0.5)
             
-        logging.info("Rectangle tool selected")
+        logger.info("Rectangle tool selected")
         return True
         
     except Exception as e:
-        logging.error(f"Error selecting rectangle tool: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error selecting rectangle tool: %s", e)
+        logger.error(traceback.format_exc())
         return False
 
 def select_oval_tool():
     """Select the oval/circle tool in Paint using keyboard shortcuts"""
     try:
-        if not focus_paint_window():
-            logging.error("Could not focus Paint window")
+        if not _ensure_focus():
+            logger.error("Could not focus Paint window")
             return False
             
         # Clear any active tool
@@ -313,75 +555,40 @@ def select_oval_tool():
         time.sleep(0.5)
         
         # Use Alt key navigation which is more reliable than mouse clicks
-        logging.info("Using Alt-key navigation to select oval/circle shape")
-        
-        # Press Alt to show keyboard shortcuts
-        pyautogui.press('alt')
-        time.sleep(0.7)
-        
-        # Press H to access the Home tab
-        pyautogui.press('h')
-        time.sleep(0.7)
+        logger.info("Using Alt-key navigation to select oval/circle shape")
         
-        # Press S to access Shapes
-        pyautogui.press('s')
-        time.sleep(0.7)
-        
-        # Press O to select Oval
-        pyautogui.press('o')
-        time.sleep(0.7)
+        # Alt shows keytips, H opens the Home tab, S opens Shapes, O selects Oval
+        _fast_key_sequence(['alt', 'h', 's', 'o'])
+        time.sleep(0.3)
         
         # Move mouse to neutral area
         canvas_info = get_paint_canvas_bounds()
         if canvas_info:
-            pyautogui.moveTo(canvas_info["center_x"], canvas_info["center_y"], duration=0.3)
+            pyautogui.moveTo(canvas_info["center_x"], canvas_info["center_y"], duration=0)
             time.sleep(0.5)
             
-        logging.info("Oval tool selected using keyboard shortcuts")
+        logger.info("Oval tool selected using keyboard shortcuts")
         return True
         
     except Exception as e:
-        logging.error(f"Error selecting oval tool: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error selecting oval tool: %s", e)
+        logger.error(traceback.format_exc())
         return False
 
 def draw_simple_rectangle(x1, y1, x2, y2):
     """Draw a rectangle from (x1,y1) to (x2,y2) using simple, reliable method"""
     try:
-        logging.info(f"Drawing simple rectangle from ({x1}, {y1}) to ({x2}, {y2})")
+        logger.info("Drawing simple rectangle from (%s, %s) to (%s, %s)", x1, y1, x2, y2)
         
-        # Ensure Paint is focused
-        if not focus_paint_window():
-            logging.error("Failed to focus Paint window")
+        # Ensure Paint is focused and the rectangle tool is selected
+        if not _ensure_ready('rect'):
+            logger.error("Failed to select rectangle tool")
             return False
             
         # Get canvas info
         canvas_info = get_paint_canvas_bounds()
         if not canvas_info:
-            logging.error("Failed to get canvas bounds")
-            return False
-            
-        # Take screenshot before drawing
-        screenshot_before = pyautogui.screenshot()
-            
-        # Select rectangle tool - first try keyboard shortcuts
-        logging.info("Trying keyboard shortcuts for rectangle...")
-        pyautogui.press('esc')  # Clear any active tool
-        time.sleep(0.5)
-        
-        # Use Alt+H, S, R sequence for rectangle
-        pyautogui.press('alt')
-        time.sleep(0.7)
-        pyautogui.press('h')
-        time.sleep(0.7)
-        pyautogui.press('s')
-        time.sleep(0.7)
-        pyautogui.press('r')
-        time.sleep(0.7)
-        
-        # If keyboard shortcuts fail, try mouse method
-        if not select_rectangle_tool():
-            logging.error("Failed to select rectangle tool")
+            logger.error("Failed to get canvas bounds")
             return False
             
         # Adjust coordinates if needed
@@ -397,7 +604,7 @@ def draw_simple_rectangle(x1, y1, x2, y2):
             y1 = canvas_top + y1
             x2 = canvas_left + x2
             y2 = canvas_top + y2
-            logging.info(f"Converted to absolute coords: ({x1}, {y1}) to ({x2}, {y2})")
+            logger.info("Converted to absolute coords: (%s, %s) to (%s, %s)", x1, y1, x2, y2)
         
         # Ensure within canvas bounds
         x1 = max(canvas_left + 20, min(x1, canvas_right - 20))
@@ -405,95 +612,79 @@ def draw_simple_rectangle(x1, y1, x2, y2):
         x2 = max(canvas_left + 20, min(x2, canvas_right - 20))
         y2 = max(canvas_top + 20, min(y2, canvas_bottom - 20))
         
+        # Take screenshot of just the rectangle area before drawing; the result
+        # is only logged, so skip verification when INFO is disabled
+        verify = logger.isEnabledFor(logging.INFO)
+        bbox = (min(x1, x2) - 5, min(y1, y2) - 5, max(x1, x2) + 5, max(y1, y2) + 5)
+        if verify:
+            screenshot_before = ImageGrab.grab(bbox=bbox, all_screens=False)
+        
         # Move to center of canvas first
         canvas_center_x = canvas_info["center_x"]
         canvas_center_y = canvas_info["center_y"]
         
-        logging.info(f"Moving to canvas center at ({canvas_center_x}, {canvas_center_y})")
-        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.5)
-        time.sleep(0.5)
-        
-        # Move to start position with small highlight motion
-        logging.info(f"Moving to start position ({x1}, {y1})")
-        pyautogui.moveTo(x1, y1, duration=0.7)
-        time.sleep(0.5)
-        
-        # Draw small circle at start point for visibility
-        offset = 5
-        for _ in range(1):  # Just once around
-            pyautogui.moveRel(offset, 0, duration=0.1)
-            pyautogui.moveRel(0, offset, duration=0.1)
-            pyautogui.moveRel(-offset, 0, duration=0.1)
-            pyautogui.moveRel(0, -offset, duration=0.1)
-            
-        # Press and hold mouse button
-        logging.info("Pressing mouse button")
-        pyautogui.mouseDown()
+        logger.info("Moving to canvas center at (%s, %s)", canvas_center_x, canvas_center_y)
+        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0)
         time.sleep(0.5)
         
-        # Move to end position slowly
-        logging.info(f"Moving to end position ({x2}, {y2})")
-        pyautogui.moveTo(x2, y2, duration=1.0)
-        time.sleep(0.5)
-        
-        # Release mouse button
-        logging.info("Releasing mouse button")
-        pyautogui.mouseUp()
+        # Drag from start to end position; Paint only uses the press and release points
+        logger.info("Dragging from (%s, %s) to (%s, %s)", x1, y1, x2, y2)
+        if not _send_drag(x1, y1, x2, y2):
+            return False
         time.sleep(0.5)
         
         # Move back to center
-        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.3)
+        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0)
         time.sleep(0.5)
         
+        if not verify:
+            return True
+            
         # Take screenshot after drawing
-        screenshot_after = pyautogui.screenshot()
-        
-        # Simple verification - check if pixels changed
-        pixels_changed = False
-        for check_x in range(min(x1, x2), max(x1, x2), 10):
-            try:
-                if (screenshot_before.getpixel((check_x, y1)) != 
-                    screenshot_after.getpixel((check_x, y1))):
-                    pixels_changed = True
-                    break
-            except:
-                pass
+        screenshot_after = ImageGrab.grab(bbox=bbox, all_screens=False)
+        
+        # Simple verification - check if pixels changed along the four edges
+        # Screenshots are relative to the bounding box
+        diff = np.any(np.asarray(screenshot_after) != np.asarray(screenshot_before), axis=-1)
+        top, bottom = min(y1, y2) - bbox[1], max(y1, y2) - bbox[1]
+        left, right = min(x1, x2) - bbox[0], max(x1, x2) - bbox[0]
+        pixels_changed = bool(diff[top, :].any() or diff[bottom, :].any() or
+                              diff[:, left].any() or diff[:, right].any())
                 
         if pixels_changed:
-            logging.info("Rectangle drawing verified - pixels changed")
+            logger.info("Rectangle drawing verified - pixels changed")
             return True
         else:
-            logging.warning("Rectangle may not have drawn correctly - no pixel changes detected")
+            logger.warning("Rectangle may not have drawn correctly - no pixel changes detected")
             return True  # Return true anyway since we attempted the drawing
             
     except Exception as e:
-        logging.error(f"Error drawing rectangle: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error drawing rectangle: %s", e)
+        logger.error(traceback.format_exc())
         return False
 
 def draw_simple_circle(center_x, center_y, radius):
     """Draw a circle at (center_x, center_y) with given radius"""
     try:
-        logging.info(f"Drawing simple circle at ({center_x}, {center_y}) with radius {radius}")
+        logger.info("Drawing simple circle at (%s, %s) with radius %s", center_x, center_y, radius)
         
-        # Ensure Paint is focused
-        if not focus_paint_window():
-            logging.error("Failed to focus Paint window")
+        # Ensure Paint is focused and the oval tool is selected
+        if not _ensure_ready('oval'):
+            logger.error("Failed to select oval tool")
             return False
             
         # Get canvas info
         canvas_info = get_paint_canvas_bounds()
         if not canvas_info:
-            logging.error("Failed to get canvas bounds")
+            logger.error("Failed to get canvas bounds")
             return False
             
-        # Take screenshot before drawing
-        screenshot_before = pyautogui.screenshot()
-            
-        # Select oval tool
-        if not select_oval_tool():
-            logging.error("Failed to select oval tool")
-            return False
+        # Take screenshot of just the circle area before drawing; the result
+        # is only logged, so skip verification when INFO is disabled
+        verify = logger.isEnabledFor(logging.INFO)
+        bbox = (center_x - radius - 5, center_y - radius - 5, center_x + radius + 5, center_y + radius + 5)
+        if verify:
+            screenshot_before = ImageGrab.grab(bbox=bbox, all_screens=False)
             
         # Calculate start and end points for the circle
         x1 = center_x - radius
@@ -517,71 +708,56 @@ def draw_simple_circle(center_x, center_y, radius):
         canvas_center_x = canvas_info["center_x"]
         canvas_center_y = canvas_info["center_y"]
         
-        logging.info(f"Moving to canvas center at ({canvas_center_x}, {canvas_center_y})")
-        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.5)
+        logger.info("Moving to canvas center at (%s, %s)", canvas_center_x, canvas_center_y)
+        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0)
         time.sleep(0.5)
         
-        # Move to start position
-        logging.info(f"Moving to start position ({x1}, {y1})")
-        pyautogui.moveTo(x1, y1, duration=0.7)
-        time.sleep(0.5)
-        
-        # Press and hold mouse button
-        logging.info("Pressing mouse button")
-        pyautogui.mouseDown()
-        time.sleep(0.5)
-        
-        # Move to end position slowly
-        logging.info(f"Moving to end position ({x2}, {y2})")
-        pyautogui.moveTo(x2, y2, duration=1.0)
-        time.sleep(0.5)
-        
-        # Release mouse button
-        logging.info("Releasing mouse button")
-        pyautogui.mouseUp()
+        # Drag from start to end position; Paint only uses the press and release points
+        logger.info("Dragging from (%s, %s) to (%s, %s)", x1, y1, x2, y2)
+        if not _send_drag(x1, y1, x2, y2):
+            return False
         time.sleep(0.5)
         
         # Move back to center
-        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0.3)
+        pyautogui.moveTo(canvas_center_x, canvas_center_y, duration=0)
         time.sleep(0.5)
         
+        if not verify:
+            return True
+            
         # Take screenshot after drawing
-        screenshot_after = pyautogui.screenshot()
-        
-        # Simple verification - check if pixels changed
-        pixels_changed = False
-        for angle in range(0, 360, 30):  # Check at different angles
-            try:
-                check_x = center_x + int(radius * 0.9 * math.cos(math.radians(angle)))
-                check_y = center_y + int(radius * 0.9 * math.sin(math.radians(angle)))
-                
-                if (screenshot_before.getpixel((check_x, check_y)) != 
-                    screenshot_after.getpixel((check_x, check_y))):
-                    pixels_changed = True
-                    break
-            except:
-                pass
+        screenshot_after = ImageGrab.grab(bbox=bbox, all_screens=False)
+        
+        # Simple verification - check if pixels changed at sample points in a
+        # ring just inside the outline
+        # Screenshots are relative to the bounding box
+        diff = np.any(np.asarray(screenshot_after) != np.asarray(screenshot_before), axis=-1)
+        check_x = [center_x - bbox[0] + int(radius * r * cos_a)
+                   for cos_a, _ in _CIRCLE_SAMPLE_ANGLES for r in _CIRCLE_SAMPLE_RADII]
+        check_y = [center_y - bbox[1] + int(radius * r * sin_a)
+                   for _, sin_a in _CIRCLE_SAMPLE_ANGLES for r in _CIRCLE_SAMPLE_RADII]
+        pixels_changed = bool(diff[check_y, check_x].any())
                 
         if pixels_changed:
-            logging.info("Circle drawing verified - pixels changed")
+            logger.info("Circle drawing verified - pixels changed")
             return True
         else:
-            logging.warning("Circle may not have drawn correctly - no pixel changes detected")
+            logger.warning("Circle may not have drawn correctly - no pixel changes detected")
             return True  # Return true anyway since we attempted the drawing
             
     except Exception as e:
-        logging.error(f"Error drawing circle: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error drawing circle: %s", e)
+        logger.error(traceback.format_exc())
         return False
 
 def save_drawing_simple(filepath):
     """Save the drawing to a file using a simpler, more reliable method"""
     try:
-        logging.info(f"Saving drawing to {filepath}")
+        logger.info("Saving drawing to %s", filepath)
         
         # Ensure Paint is focused
         if not focus_paint_window():
-            logging.error("Failed to focus Paint window")
+            logger.error("Failed to focus Paint window")
             return False
             
         # Create directory if needed
@@ -590,60 +766,58 @@ def save_drawing_simple(filepath):
             os.makedirs(save_dir)
             
         # Press Ctrl+S to open save dialog
-        logging.info("Opening save dialog")
+        logger.info("Opening save dialog")
         pyautogui.hotkey('ctrl', 's')
-        time.sleep(1.5)
+        if not _wait_until(lambda: 'Save As' in win32gui.GetWindowText(win32gui.GetForegroundWindow())):
+            logger.warning("Save As dialog not detected, entering path anyway")
         
-        # Type the file path
-        logging.info(f"Typing file path: {filepath}")
-        pyautogui.write(filepath)
-        time.sleep(1.0)
+        # Enter the file path
+        logger.info("Pasting file path: %s", filepath)
+        _paste_text(filepath)
         
         # Press Enter to save
-        logging.info("Pressing Enter to save")
+        logger.info("Pressing Enter to save")
         pyautogui.press('enter')
-        time.sleep(2.0)
         
         # Check if the file was created
-        if os.path.exists(filepath):
-            logging.info(f"File saved successfully to {filepath}")
+        if _wait_until(lambda: os.path.exists(filepath)):
+            logger.info("File saved successfully to %s", filepath)
             return True
         else:
-            logging.error(f"File not found at {filepath} after save attempt")
+            logger.error("File not found at %s after save attempt", filepath)
             
             # Check if a "replace" dialog appeared
             # Press 'y' to confirm overwrite if the file already exists
-            logging.info("Checking for overwrite dialog and pressing 'y'")
+            logger.info("Checking for overwrite dialog and pressing 'y'")
             pyautogui.press('y')
-            time.sleep(2.0)
             
-            if os.path.exists(filepath):
-                logging.info(f"File saved successfully after overwrite confirmation")
+            if _wait_until(lambda: os.path.exists(filepath)):
+                logger.info("File saved successfully after overwrite confirmation")
                 return True
             else:
-                logging.error("File still not saved after possible overwrite dialog")
+                logger.error("File still not saved after possible overwrite dialog")
                 return False
                 
     except Exception as e:
-        logging.error(f"Error saving drawing: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error saving drawing: %s", e)
+        logger.error(traceback.format_exc())
         return False
 
 def main():
     """Test the simple drawing functions"""
     setup_logging()
-    logging.info("Starting simple drawing test")
+    logger.info("Starting simple drawing test")
     
     try:
         # Open Paint
         if not open_paint_simple():
-            logging.error("Failed to open Paint")
+            logger.error("Failed to open Paint")
             return False
             
         # Get canvas info
         canvas_info = get_paint_canvas_bounds()
         if not canvas_info:
-            logging.error("Failed to get canvas bounds")
+            logger.error("Failed to get canvas bounds")
             return False
             
         # Draw a rectangle
@@ -653,7 +827,7 @@ def main():
         rect_y2 = rect_y1 + int(canvas_info["height"] * 0.3)
         
         if not draw_simple_rectangle(rect_x1, rect_y1, rect_x2, rect_y2):
-            logging.error("Failed to draw rectangle")
+            logger.error("Failed to draw rectangle")
             
         time.sleep(1.0)
         
@@ -663,7 +837,7 @@ def main():
         circle_radius = int(min(canvas_info["width"], canvas_info["height"]) * 0.15)
         
         if not draw_simple_circle(circle_x, circle_y, circle_radius):
-            logging.error("Failed to draw circle")
+            logger.error("Failed to draw circle")
             
         time.sleep(1.0)
         
@@ -676,14 +850,14 @@ def main():
         output_path = os.path.join(output_dir, f"simple_drawing_{timestamp}.png")
         
         if not save_drawing_simple(output_path):
-            logging.error("Failed to save drawing")
+            logger.error("Failed to save drawing")
         
-        logging.info("Simple drawing test completed")
+        logger.info("Simple drawing test completed")
         return True
         
     except Exception as e:
-        logging.error(f"Error in main function: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.error("Error in main function: %s", e)
+        logger.error(traceback.format_exc())
         return False
 
 if __name__ == "__main__":
@@ -7,42 +7,125 @@ import os
 import sys
 import time
 import logging
+import logging.handlers
+import queue
+import atexit
 import subprocess
+import numpy as np
 import pyautogui
 import ctypes
+from ctypes import wintypes
 import win32gui
 import win32con
+import win32ui
+from PIL import Image
 
 # Ensure fail-safe is off
 pyautogui.FAILSAFE = False
+# Explicit sleeps below handle timing; drop pyautogui's implicit per-call pause
+pyautogui.PAUSE = 0
+
+# DPI awareness context handle and the DPI_AWARENESS values it can resolve to
+DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2 = -4
+DPI_AWARENESS_UNAWARE = 0
+DPI_AWARENESS_SYSTEM_AWARE = 1
+DPI_AWARENESS_PER_MONITOR_AWARE = 2
+
+# Canvas offset from the window's top-left corner at 100% scaling (96 DPI)
+CANVAS_OFFSET_X = 10
+CANVAS_OFFSET_Y = 170
+
+# Set PAINT_DEBUG=1 to save before/after ROI captures when a draw fails verification
+PAINT_DEBUG = os.getenv('PAINT_DEBUG') == '1'
+DEBUG_DIR = "debug_screenshots"
+if PAINT_DEBUG:
+    os.makedirs(DEBUG_DIR, exist_ok=True)
+
+# Background listener that owns the log handlers, started once by setup_logging
+_log_listener = None
+_log_file = None
+
+# Paint window handle and rect reused across draws while the window stays valid
+_paint_cache = {'hwnd': None, 'rect': None, 'canvas_origin': None}
+_rect_tool_selected = False
+
+# Ribbon keytips for Home > Shapes (SH) > Rectangle (R)
+RECTANGLE_KEYTIPS = ['alt', 'h', 's', 'h', 'r']
+
+# Win32 SendInput structures for mouse events
+INPUT_MOUSE = 0
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_RIGHTDOWN = 0x0008
+MOUSEEVENTF_RIGHTUP = 0x0010
+MOUSEEVENTF_ABSOLUTE = 0x8000
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", wintypes.LONG),
+                ("dy", wintypes.LONG),
+                ("mouseData", wintypes.DWORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ctypes.c_size_t)]
+
+class _INPUTUNION(ctypes.Union):
+    # Sized for the largest member (KEYBDINPUT/HARDWAREINPUT are smaller)
+    _fields_ = [("mi", MOUSEINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD),
+                ("union", _INPUTUNION)]
 
 def setup_logging():
-    """Set up logging"""
+    """Set up logging, writing to file and stdout on a background thread"""
+    global _log_listener, _log_file
+    if _log_listener is not None:
+        return _log_file
+    
     log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    os.makedirs(log_dir, exist_ok=True)
     
     log_file = os.path.join(log_dir, "simple_drawing.log")
     
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler(log_file)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    file_handler.setFormatter(formatter)
+    stream_handler.setFormatter(formatter)
+    
+    # Callers only enqueue records; the listener thread does the blocking I/O.
+    # The queue handler gets no formatter so records are formatted only once, by the listener's handlers
+    log_queue = queue.Queue(-1)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    
+    _log_file = log_file
     return log_file
 
 def find_paint_window():
     """Find the Paint window handle"""
-    paint_window = win32gui.FindWindow(None, "Untitled - Paint")
-    if not paint_window:
-        # Try other possible titles
-        for title in ["Paint", "*.bmp - Paint", "*.png - Paint"]:
-            paint_window = win32gui.FindWindow(None, title)
-            if paint_window:
-                break
+    found = []
+    
+    def match(hwnd, _):
+        # "Paint" on its own, or "<document> - Paint" for any open file
+        title = win32gui.GetWindowText(hwnd)
+        if title == "Paint" or title.endswith(" - Paint"):
+            found.append(hwnd)
+            return False  # Stop enumerating at the first match
+        return True
+    
+    # One pass over the top-level windows instead of a FindWindow per title
+    try:
+        win32gui.EnumWindows(match, None)
+    except win32gui.error:
+        # EnumWindows reports an error when the callback stops enumeration early
+        pass
+    paint_window = found[0] if found else None
     
     if paint_window:
         logging.info(f"Found Paint window: {paint_window}")
@@ -54,7 +137,7 @@ def find_paint_window():
         return None
 
 def open_paint():
-    """Open MS Paint using os.system"""
+    """Open MS Paint and wait for it to become ready for input"""
     try:
         # Check if Paint is already open
         paint_window = find_paint_window()
@@ -64,38 +147,59 @@ def open_paint():
         
         # Launch Paint
         logging.info("Launching MS Paint...")
-        os.system("start mspaint")
+        proc = subprocess.Popen(["mspaint.exe"])
         
-        # Allow time for Paint to start
-        for i in range(10):
-            time.sleep(1)
+        # Block until Paint's message loop is idle instead of sleeping blindly
+        ctypes.windll.user32.WaitForInputIdle(int(proc._handle), 5000)
+        
+        # Short poll for the main window to appear
+        start = time.time()
+        for _ in range(50):
             paint_window = find_paint_window()
             if paint_window:
-                logging.info(f"Paint launched after {i+1} seconds")
+                logging.info(f"Paint launched after {time.time() - start:.2f} seconds")
                 return paint_window
+            time.sleep(0.05)
         
-        logging.error("Failed to launch Paint after 10 seconds")
+        logging.error("Failed to find Paint window after launch")
         return None
         
     except Exception as e:
         logging.error(f"Error opening Paint: {str(e)}")
         return None
 
+def _settle(ms=100):
+    """Give Paint's UI a bounded moment to react to the last input"""
+    # WaitForInputIdle only reports a process's first idle transition, so it can't be reused here
+    time.sleep(ms / 1000)
+
+def _grab_after_change(grab, before, timeout=0.5, poll=0.025):
+    """Re-capture the ROI until it differs from before (then once more to let the repaint finish) or timeout"""
+    deadline = time.monotonic() + timeout
+    after = _grab_roi(*grab)
+    while np.array_equal(after, before) and time.monotonic() < deadline:
+        time.sleep(poll)
+        after = _grab_roi(*grab)
+    if not np.array_equal(after, before):
+        time.sleep(poll)
+        after = _grab_roi(*grab)
+    return after
+
 def focus_window(hwnd):
     """Focus a window using multiple methods"""
     try:
         # Restore if minimized
         if win32gui.IsIconic(hwnd):
             win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            time.sleep(1)
+            _settle()
         
         # Try to bring to foreground
         win32gui.SetForegroundWindow(hwnd)
-        time.sleep(1)
+        _settle()
         
         # Maximize
         win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
-        time.sleep(1)
+        _settle()
         
         # Check if focused
         foreground = win32gui.GetForegroundWindow()
@@ -108,7 +212,7 @@ def focus_window(hwnd):
             center_x = (rect[0] + rect[2]) // 2
             top_y = rect[1] + 10
             pyautogui.click(center_x, top_y)
-            time.sleep(1)
+            _settle()
             
             # Check again
             foreground = win32gui.GetForegroundWindow()
@@ -124,159 +228,286 @@ def focus_window(hwnd):
         # Continue anyway
         return True
 
+def _send_mouse(x, y, flags=0):
+    """Send one absolute mouse event at screen position (x, y) via SendInput"""
+    screen_width = ctypes.windll.user32.GetSystemMetrics(0)  # SM_CXSCREEN
+    screen_height = ctypes.windll.user32.GetSystemMetrics(1)  # SM_CYSCREEN
+    
+    # SendInput expects absolute coordinates normalized to 0..65535
+    mi = MOUSEINPUT(dx=(x * 65535) // (screen_width - 1),
+                    dy=(y * 65535) // (screen_height - 1),
+                    dwFlags=flags | MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE)
+    inp = INPUT(type=INPUT_MOUSE, union=_INPUTUNION(mi=mi))
+    return ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(inp)) == 1
+
+def _grab_roi(left, top, width, height):
+    """Copy a screen region into a BGRA ndarray of shape (height, width, 4) using BitBlt"""
+    screen_dc = win32gui.GetDC(0)
+    src_dc = win32ui.CreateDCFromHandle(screen_dc)
+    mem_dc = src_dc.CreateCompatibleDC()
+    bitmap = win32ui.CreateBitmap()
+    try:
+        bitmap.CreateCompatibleBitmap(src_dc, width, height)
+        mem_dc.SelectObject(bitmap)
+        mem_dc.BitBlt((0, 0), (width, height), src_dc, (left, top), win32con.SRCCOPY)
+        bits = bitmap.GetBitmapBits(True)
+    finally:
+        mem_dc.DeleteDC()
+        src_dc.DeleteDC()
+        win32gui.ReleaseDC(0, screen_dc)
+        win32gui.DeleteObject(bitmap.GetHandle())
+    
+    return np.frombuffer(bits, dtype=np.uint8).reshape(height, width, 4)
+
+def _drag(x1, y1, x2, y2):
+    """Press at (x1, y1), move straight to (x2, y2) and release"""
+    return (_send_mouse(x1, y1, MOUSEEVENTF_LEFTDOWN)
+            and _send_mouse(x2, y2)
+            and _send_mouse(x2, y2, MOUSEEVENTF_LEFTUP))
+
 def direct_mouse_click(x, y, button='left'):
     """Perform a direct mouse click at specified coordinates"""
-    pyautogui.moveTo(x, y, duration=0.5)
-    time.sleep(0.5)
-    pyautogui.click(button=button)
-    time.sleep(0.5)
+    if button == 'right':
+        down, up = MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP
+    else:
+        down, up = MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP
+    
+    _send_mouse(x, y)
+    time.sleep(0.05)
+    _send_mouse(x, y, down)
+    _send_mouse(x, y, up)
+    _settle()
 
-def draw_rectangle_direct(x1, y1, x2, y2):
+def init_dpi_awareness():
     """
-    Draw a rectangle in MS Paint using direct mouse events
-    Coordinates are relative to the canvas
+    Ask for per-monitor v2 DPI awareness so window rects, cursor positions and
+    captures are all in physical pixels. Returns True if the request was accepted.
     """
+    user32 = ctypes.windll.user32
+    try:
+        user32.SetProcessDpiAwarenessContext.argtypes = [ctypes.c_void_p]
+        user32.SetProcessDpiAwarenessContext.restype = wintypes.BOOL
+    except AttributeError:
+        logging.warning("SetProcessDpiAwarenessContext unavailable (older than Windows 10 1703)")
+        return False
+    
+    # Fails with ERROR_ACCESS_DENIED when awareness was already set, e.g. by an imported library
+    if not user32.SetProcessDpiAwarenessContext(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2):
+        logging.warning(f"Could not set per-monitor DPI awareness (error {ctypes.GetLastError()}), "
+                        f"using current awareness {_dpi_awareness()}")
+        return False
+    return True
+
+def _dpi_awareness():
+    """Return the DPI_AWARENESS value actually in effect for this thread"""
+    user32 = ctypes.windll.user32
     try:
-        # Open Paint
-        paint_hwnd = open_paint()
+        user32.GetThreadDpiAwarenessContext.restype = ctypes.c_void_p
+        user32.GetAwarenessFromDpiAwarenessContext.argtypes = [ctypes.c_void_p]
+        user32.GetAwarenessFromDpiAwarenessContext.restype = ctypes.c_int
+    except AttributeError:
+        return DPI_AWARENESS_UNAWARE
+    return user32.GetAwarenessFromDpiAwarenessContext(user32.GetThreadDpiAwarenessContext())
+
+def _dpi_scale(hwnd):
+    """Factor that maps 96 DPI layout offsets into the coordinates this process sees"""
+    awareness = _dpi_awareness()
+    user32 = ctypes.windll.user32
+    if awareness == DPI_AWARENESS_PER_MONITOR_AWARE:
+        dpi = user32.GetDpiForWindow(hwnd)
+    elif awareness == DPI_AWARENESS_SYSTEM_AWARE:
+        dpi = user32.GetDpiForSystem()
+    else:
+        # Unaware processes get coordinates virtualized to 96 DPI
+        dpi = 96
+    return (dpi or 96) / 96.0
+
+def _refresh_window_rect(hwnd):
+    """Re-read the window rect, re-deriving the canvas origin only when the window moved or resized"""
+    window_rect = win32gui.GetWindowRect(hwnd)
+    if window_rect != _paint_cache['rect']:
+        # Scale the 96 DPI canvas offsets for the awareness actually in effect
+        scale = _dpi_scale(hwnd)
+        canvas_origin = (window_rect[0] + round(CANVAS_OFFSET_X * scale),
+                         window_rect[1] + round(CANVAS_OFFSET_Y * scale))
+        _paint_cache.update(rect=window_rect, canvas_origin=canvas_origin)
+    return window_rect
+
+def _ensure_paint_ready():
+    """
+    Return (hwnd, window_rect) for a focused Paint window
+    Reuses the cached window when Paint is still in the foreground and not minimized
+    """
+    global _rect_tool_selected
+    paint_hwnd = _paint_cache['hwnd']
+    if (paint_hwnd and win32gui.IsWindow(paint_hwnd)
+            and win32gui.GetForegroundWindow() == paint_hwnd
+            and not win32gui.IsIconic(paint_hwnd)):
+        return paint_hwnd, _refresh_window_rect(paint_hwnd)
+    
+    # Focus was lost (or first use), so the tool selection can't be trusted either
+    _rect_tool_selected = False
+    
+    # Open Paint
+    paint_hwnd = open_paint()
+    if not paint_hwnd:
+        logging.error("Failed to open Paint")
+        _paint_cache.update(hwnd=None, rect=None, canvas_origin=None)
+        return None, None
+    
+    # Ensure Paint is in focus
+    if win32gui.GetForegroundWindow() != paint_hwnd or win32gui.IsIconic(paint_hwnd):
+        focus_window(paint_hwnd)
+    
+    # Get window dimensions
+    _paint_cache['hwnd'] = paint_hwnd
+    return paint_hwnd, _refresh_window_rect(paint_hwnd)
+
+def _select_rectangle_tool():
+    """Select Paint's rectangle tool via ribbon keytips, skipping the keytips when already selected"""
+    global _rect_tool_selected
+    
+    # Press Escape every time: it commits the previous shape so the next drag can't grab it
+    pyautogui.press('esc')
+    time.sleep(0.05)
+    if _rect_tool_selected:
+        return
+    
+    logging.info("Selecting rectangle tool")
+    
+    # Keytips don't depend on window size or DPI, unlike guessed toolbar coordinates
+    pyautogui.press(RECTANGLE_KEYTIPS, interval=0.05)
+    _settle()
+    
+    _rect_tool_selected = True
+
+def _save_debug_screenshots(before, after):
+    """Save the before/after BGRA captures as PNGs for inspecting a failed draw"""
+    timestamp = int(time.time())
+    before_path = os.path.join(DEBUG_DIR, f"simple_before_{timestamp}.png")
+    after_path = os.path.join(DEBUG_DIR, f"simple_after_{timestamp}.png")
+    Image.fromarray(before[..., 2::-1]).save(before_path)
+    Image.fromarray(after[..., 2::-1]).save(after_path)
+    logging.info(f"Saved debug screenshots: {before_path}, {after_path}")
+
+def _do_drag(x1, y1, x2, y2):
+    """Drag out one rectangle given in canvas coordinates"""
+    canvas_left, canvas_top = _paint_cache['canvas_origin']
+    
+    # Convert to screen coordinates
+    screen_x1 = canvas_left + x1
+    screen_y1 = canvas_top + y1
+    screen_x2 = canvas_left + x2
+    screen_y2 = canvas_top + y2
+    
+    logging.info(f"Drawing rectangle from ({screen_x1},{screen_y1}) to ({screen_x2},{screen_y2})")
+    
+    # Drag diagonally, the rectangle preview follows the cursor regardless of path
+    if not _drag(screen_x1, screen_y1, screen_x2, screen_y2):
+        logging.error("SendInput failed to deliver the drag")
+        return False
+    _settle()
+    return True
+
+def _do_draw(rects):
+    """Drag out each rectangle on the canvas, then verify that pixels changed along their outlines"""
+    win_x, win_y = _paint_cache['rect'][:2]
+    canvas_left, canvas_top = _paint_cache['canvas_origin']
+    
+    # Capture only the bounding box of all rectangles (edges included) for comparison
+    roi_left = canvas_left + min(min(x1, x2) for x1, _, x2, _ in rects)
+    roi_top = canvas_top + min(min(y1, y2) for _, y1, _, y2 in rects)
+    roi_width = canvas_left + max(max(x1, x2) for x1, _, x2, _ in rects) - roi_left + 1
+    roi_height = canvas_top + max(max(y1, y2) for _, y1, _, y2 in rects) - roi_top + 1
+    
+    # Clip the capture to the screen up front rather than reading past its edges
+    grab_left, grab_top = max(0, roi_left), max(0, roi_top)
+    grab_right = min(ctypes.windll.user32.GetSystemMetrics(0), roi_left + roi_width)  # SM_CXSCREEN
+    grab_bottom = min(ctypes.windll.user32.GetSystemMetrics(1), roi_top + roi_height)  # SM_CYSCREEN
+    if grab_right <= grab_left or grab_bottom <= grab_top:
+        logging.error("Rectangles lie entirely off screen")
+        return False
+    grab = (grab_left, grab_top, grab_right - grab_left, grab_bottom - grab_top)
+    before = _grab_roi(*grab)
+    
+    for i, rect in enumerate(rects):
+        if i:
+            # Commit the previous shape, otherwise a drag starting inside its box moves or resizes it
+            pyautogui.press('esc')
+            time.sleep(0.05)
+        if not _do_drag(*rect):
+            return False
+    
+    # Move cursor away to see result
+    ctypes.windll.user32.SetCursorPos(win_x + 50, win_y + 50)
+    
+    # Capture the same region once Paint has repainted it
+    after = _grab_after_change(grab, before)
+    
+    # The rectangle tool draws outlines, so compare a 4px band along each rectangle's own edges
+    diff = np.any(before[..., :3] != after[..., :3], axis=2)
+    missing = []
+    for x1, y1, x2, y2 in rects:
+        left = canvas_left + min(x1, x2) - roi_left
+        top = canvas_top + min(y1, y2) - roi_top
+        right = left + abs(x2 - x1) + 1
+        bottom = top + abs(y2 - y1) + 1
+        border_mask = np.zeros((roi_height, roi_width), dtype=bool)
+        border_mask[top:top + 4, left:right] = True
+        border_mask[max(top, bottom - 4):bottom, left:right] = True
+        border_mask[top:bottom, left:left + 4] = True
+        border_mask[top:bottom, max(left, right - 4):right] = True
+        border_mask = border_mask[grab_top - roi_top:grab_bottom - roi_top,
+                                  grab_left - roi_left:grab_right - roi_left]
+        changed_pixels = int(diff[border_mask].sum())
+        logging.info(f"Detected {changed_pixels} changed pixels along rectangle ({x1},{y1})-({x2},{y2})")
+        if changed_pixels <= 5:
+            missing.append((x1, y1, x2, y2))
+    
+    if not missing:
+        logging.info("Rectangles appear to have been drawn successfully")
+        return True
+    else:
+        logging.error(f"Rectangles may not have been drawn (no significant pixel changes): {missing}")
+        if PAINT_DEBUG:
+            _save_debug_screenshots(before, after)
+        return False
+
+def draw_rectangles_direct(rects):
+    """
+    Draw several rectangles in MS Paint in one session
+    Each rect is (x1, y1, x2, y2) relative to the canvas; focus and tool selection happen once
+    """
+    if not rects:
+        return True
+    
+    try:
+        paint_hwnd, window_rect = _ensure_paint_ready()
         if not paint_hwnd:
-            logging.error("Failed to open Paint")
             return False
         
-        # Ensure Paint is in focus
-        focus_window(paint_hwnd)
-        
-        # Get window dimensions
-        window_rect = win32gui.GetWindowRect(paint_hwnd)
         win_x, win_y, win_right, win_bottom = window_rect
-        win_width = win_right - win_x
-        win_height = win_bottom - win_y
-        logging.info(f"Paint window: {win_width}x{win_height} at ({win_x},{win_y})")
-        
-        # Take screenshot before for comparison
-        screenshot_before = pyautogui.screenshot()
-        
-        # Press Escape to ensure no tool is active
-        pyautogui.press('esc')
-        time.sleep(0.5)
+        logging.info(f"Paint window: {win_right - win_x}x{win_bottom - win_y} at ({win_x},{win_y})")
         
-        # SIMPLIFIED: Use a single direct approach that is most likely to work
-        # 1. Select rectangle tool
-        logging.info("Selecting rectangle tool")
+        _select_rectangle_tool()
+        return _do_draw(rects)
         
-        # First try to click on Shapes in the toolbar (usually around 35% from left)
-        shapes_x = win_x + int(win_width * 0.35)
-        shapes_y = win_y + 75  # Approximately 75px from top edge
-        direct_mouse_click(shapes_x, shapes_y)
-        
-        # Now click on Rectangle (usually first shape in dropdown)
-        rect_x = shapes_x
-        rect_y = shapes_y + 40
-        direct_mouse_click(rect_x, rect_y)
-        
-        # Calculate canvas area (Paint canvas typically starts ~170px from top)
-        canvas_top = win_y + 170
-        canvas_left = win_x + 10
-        
-        # Convert to screen coordinates
-        screen_x1 = canvas_left + x1
-        screen_y1 = canvas_top + y1
-        screen_x2 = canvas_left + x2
-        screen_y2 = canvas_top + y2
-        
-        logging.info(f"Drawing rectangle from ({screen_x1},{screen_y1}) to ({screen_x2},{screen_y2})")
-        
-        # First, move cursor to a "safe" position to ensure it's visible
-        pyautogui.moveTo(win_x + 100, win_y + 100, duration=0.5)
-        time.sleep(0.5)
-        
-        # Move to start position with small circle for visibility
-        for _ in range(2):
-            offset = 5
-            pyautogui.moveTo(screen_x1 + offset, screen_y1, duration=0.1)
-            pyautogui.moveTo(screen_x1, screen_y1 + offset, duration=0.1)
-            pyautogui.moveTo(screen_x1 - offset, screen_y1, duration=0.1)
-            pyautogui.moveTo(screen_x1, screen_y1 - offset, duration=0.1)
-        
-        # Position for drawing
-        pyautogui.moveTo(screen_x1, screen_y1, duration=0.5)
-        time.sleep(0.5)
-        
-        # Press mouse button with visual feedback
-        logging.info("Pressing mouse DOWN")
-        pyautogui.mouseDown()
-        # Do it twice for reliability
-        pyautogui.mouseDown()
-        time.sleep(0.5)
-        
-        # Move to end position (do it in steps for visibility)
-        # First move horizontally
-        midpoint_x = screen_x2
-        midpoint_y = screen_y1
-        logging.info(f"Moving horizontally to ({midpoint_x}, {midpoint_y})")
-        pyautogui.moveTo(midpoint_x, midpoint_y, duration=0.7)
-        time.sleep(0.3)
-        
-        # Then move vertically to complete rectangle
-        logging.info(f"Moving vertically to ({screen_x2}, {screen_y2})")
-        pyautogui.moveTo(screen_x2, screen_y2, duration=0.7)
-        time.sleep(0.5)
-        
-        # Release mouse button with visual feedback
-        logging.info("Releasing mouse UP")
-        pyautogui.mouseUp()
-        # Do it twice for reliability
-        pyautogui.mouseUp()
-        time.sleep(1)
-        
-        # Move cursor away to see result
-        pyautogui.moveTo(win_x + 50, win_y + 50, duration=0.5)
-        time.sleep(1)
-        
-        # Take screenshot after for comparison
-        screenshot_after = pyautogui.screenshot()
-        
-        # Save debug screenshots
-        debug_dir = "debug_screenshots"
-        if not os.path.exists(debug_dir):
-            os.makedirs(debug_dir)
-            
-        timestamp = int(time.time())
-        before_path = os.path.join(debug_dir, f"simple_before_{timestamp}.png")
-        after_path = os.path.join(debug_dir, f"simple_after_{timestamp}.png")
-        screenshot_before.save(before_path)
-        screenshot_after.save(after_path)
-        logging.info(f"Saved debug screenshots: {before_path}, {after_path}")
-        
-        # Check if pixels have changed in drawing area
-        changed_pixels = 0
-        for x in range(min(screen_x1, screen_x2), max(screen_x1, screen_x2), 20):
-            for y in range(min(screen_y1, screen_y2), max(screen_y1, screen_y2), 20):
-                try:
-                    before_rgb = screenshot_before.getpixel((x, y))
-                    after_rgb = screenshot_after.getpixel((x, y))
-                    if before_rgb != after_rgb:
-                        changed_pixels += 1
-                        if changed_pixels <= 5:  # Log a few samples
-                            logging.info(f"Pixel changed at ({x},{y}): {before_rgb} -> {after_rgb}")
-                except Exception as e:
-                    pass
-        
-        logging.info(f"Detected {changed_pixels} changed pixels")
-        if changed_pixels > 5:
-            logging.info("Rectangle appears to have been drawn successfully")
-            return True
-        else:
-            logging.error("Rectangle may not have been drawn (no significant pixel changes)")
-            return False
-            
     except Exception as e:
-        logging.error(f"Error drawing rectangle: {str(e)}", exc_info=True)
+        logging.error(f"Error drawing rectangles: {str(e)}", exc_info=True)
+        _paint_cache.update(hwnd=None, rect=None, canvas_origin=None)
         return False
 
+def draw_rectangle_direct(x1, y1, x2, y2):
+    """
+    Draw a rectangle in MS Paint using direct mouse events
+    Coordinates are relative to the canvas
+    """
+    return draw_rectangles_direct([(x1, y1, x2, y2)])
+
 def main():
     """Main test function"""
     setup_logging()
+    init_dpi_awareness()
     logging.info("=== Starting Simple Rectangle Drawing Test ===")
     print("Starting Simple Rectangle Drawing Test...")
     